@@ -1,11 +1,32 @@
-from flask import Flask, render_template, request, redirect, url_for, current_app
+from flask import Flask, render_template, request, redirect, url_for, current_app, abort, make_response, send_file
 from werkzeug.exceptions import HTTPException
+import os
+import io
+import csv
+import time
+import click
 import sqlite3
 import urllib.request
 import urllib.parse
 import urllib.error
+import http.client
+import threading
+import queue
+import re
 import json
+import random
+import uuid
+import zlib
 import hashlib
+from datetime import datetime, timezone, timedelta
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from PIL import Image   # optional: downscale cached thumbnails
+except ImportError:
+    Image = None
 
 # ===============================
 # Global Configuration
@@ -13,6 +34,51 @@ import hashlib
 
 API_KEY = "YOUR_API_KEY"   # YouTube API key
 DB = "youtube.db"        # SQLite database file name
+DB_POOL_SIZE = 8         # Max open SQLite connections per process
+DB_BUSY_TIMEOUT = 5      # Seconds to wait on a locked database / busy pool
+DB_STATEMENT_CACHE = 128 # Prepared statements cached per connection
+
+API_BASE = "https://www.googleapis.com/youtube/v3"  # YouTube Data API root
+FETCH_MODE = "pipelined"  # "pipelined" (overlap network + parsing) or "sequential"
+FETCH_WORKERS = 4         # Background threads for API calls
+PAGE_PREFETCH = 2         # Item pages buffered ahead of the video builder
+REFRESH_MODE = "incremental"  # "incremental" (ETags + hash check) or "full"
+SYNC_MODE = "streaming"   # "streaming" (pages staged in SQLite, flat memory) or "batch" (whole playlist in memory)
+STAGING_TTL = 24 * 60 * 60  # Seconds before staged rows of a crashed sync are cleared
+VIDEO_PAGE_SIZE = 50      # Videos per page on the playlist page / videos API
+VIDEO_PAGE_MAX = 200      # Largest page the videos API will return
+SEARCH_PAGE_SIZE = 20     # Video results per search page
+SEARCH_MAX_PAGE = 50      # Deepest search page served
+PAGE_CACHE_BYTES = 32 * 1024 * 1024  # Memory budget for cached rendered pages
+
+API_RATE_LIMIT = 20       # Max YouTube API calls per second, shared by all threads (0 = unlimited)
+API_BURST = 20            # Calls allowed back to back before the rate limit kicks in
+API_TIMEOUT = 10          # Seconds a YouTube API connect/read may take
+API_RETRIES = 4           # Retries of a failed call (timeouts, 5xx, 429)
+API_BACKOFF = 0.5         # First retry waits up to this many seconds, doubling after
+API_BACKOFF_MAX = 30      # Longest wait between retries
+API_BREAKER_THRESHOLD = 5 # Failures in a row that stop API calls (0 = never)
+API_BREAKER_COOLDOWN = 60 # Seconds before calls are tried again
+API_DAILY_QUOTA = 10000   # YouTube quota units per day (0 = unlimited)
+API_COST = {"playlists": 1, "playlistItems": 1}  # Quota units per call
+QUOTA_TZ = timezone(timedelta(hours=-8))         # Quota day boundary (Pacific)
+
+REFRESH_INTERVAL = 6 * 60 * 60  # Seconds before a saved playlist is refreshed again
+REFRESH_JITTER = 10 * 60        # Max extra seconds per playlist, spreads refreshes out
+FULL_REFRESH_INTERVAL = 7 * 24 * 60 * 60  # Seconds before a scheduled refresh crawls every page again (0 = never)
+REFRESH_WORKERS = 2             # Playlists refreshed at the same time
+SCHEDULER_TICK = 60             # Seconds between scans for stale playlists
+JOB_HISTORY = 200               # Finished refresh jobs kept for status checks
+IMPORT_WORKERS = 4              # Playlists imported at the same time by import-playlists
+
+THUMB_DIR = "thumbs"            # Disk cache folder for thumbnails
+THUMB_CACHE_BYTES = 512 * 1024 * 1024  # Disk budget for cached thumbnails
+THUMB_MAX_AGE = 30 * 24 * 60 * 60      # Browser cache lifetime of proxied thumbnails (seconds)
+THUMB_TOUCH_INTERVAL = 60 * 60  # Seconds between access time updates (LRU precision)
+THUMB_TIMEOUT = 10              # Seconds allowed for a thumbnail download
+THUMB_WORKERS = 4               # Background thumbnail downloads
+THUMB_PREFETCH = True           # Download thumbnails when playlists are saved
+THUMB_WIDTH = 320               # Downscale wider thumbnails (needs Pillow; 0 = keep size)
 
 app = Flask(__name__)
 
@@ -21,49 +87,155 @@ app = Flask(__name__)
 # Database Helper
 # ===============================
 
+class ConnectionPool:
+    """
+    Thread-safe pool of SQLite connections, opened once and reused.
+    Every connection runs in WAL mode with synchronous=NORMAL,
+    a busy timeout and a prepared statement cache.
+    """
+
+    def __init__(self, path, size=DB_POOL_SIZE, timeout=DB_BUSY_TIMEOUT):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Start empty (first use, or first use after a fork)."""
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._open = 0
+        self._stats = {"acquired": 0, "waits": 0, "wait_time": 0.0, "max_wait": 0.0}
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE
+        )
+        conn.row_factory = sqlite3.Row
+
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+        # turn on foreign key to manage relations
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Open a new connection while under the pool size
+        with self._lock:
+            can_open = self._open < self.size
+            if can_open:
+                self._open += 1
+
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._open -= 1
+                raise
+
+        # Pool exhausted → wait for a connection to come back
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("database connection pool exhausted")
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            self._stats["waits"] += 1
+            self._stats["wait_time"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of the block."""
+        if os.getpid() != self._pid:
+            # Forked worker: never share the parent's SQLite handles
+            self._reset()
+
+        conn = self._acquire()
+        with self._lock:
+            self._stats["acquired"] += 1
+
+        try:
+            yield conn
+        finally:
+            # Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def status(self):
+        """Pool usage numbers for sizing."""
+        with self._lock:
+            stats = dict(self._stats)
+            idle = self._idle.qsize()
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "acquired": stats["acquired"],
+                "waits": stats["waits"],
+                "wait_time_ms": round(stats["wait_time"] * 1000, 3),
+                "avg_wait_ms": round(stats["wait_time"] * 1000 / stats["waits"], 3) if stats["waits"] else 0.0,
+                "max_wait_ms": round(stats["max_wait"] * 1000, 3),
+            }
+
+
+db_pool = ConnectionPool(DB)
+
+
 def run_query(query, params=None, commit=False):
     """
-    Execute SQL queries safely.
+    Execute SQL queries safely on a pooled connection.
     - For SELECT queries → returns rows (list of sqlite3.Row)
     - For INSERT/UPDATE/DELETE → commit=True and returns True
-    - On error → returns None
     """
-    conn = sqlite3.connect(DB)  
-    conn.row_factory = sqlite3.Row  
-    
-    # turn on foreign key to manage relations
-    conn.execute("PRAGMA foreign_keys = ON;")
-    cur = conn.cursor()  
+    with db_pool.connection() as conn:
+        cur = conn.execute(query, params or ())
 
-    if params:
-        cur.execute(query, params)
-    else:
-        cur.execute(query)
+        if commit:
+            conn.commit()
+            return True
 
-    if commit:
-        conn.commit()
-        conn.close()
-        return True
+        return cur.fetchall()
 
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+
+@contextmanager
+def transaction():
+    """
+    Borrow a pooled connection for a group of statements.
+    Commits once on success, rolls back everything on error.
+    """
+    with db_pool.connection() as conn:
+        with conn:
+            yield conn
 
 
 # ===============================
-# Database Schema Initialization
+# Database Schema Migrations
 # ===============================
 
-def init_db():
+def migrate_base(c):
     """
-    Create database tables if they don't exist.
-    Also sets up helpful indexes and foreign key cascade.
+    v1: playlist + video tables.
+    Also upgrades databases made before ETags / scheduled refreshes, and
+    drops the indexes the old duplicated init_db() created: both only
+    repeated a PRIMARY KEY (plus the hash) and just slowed every write.
     """
-    conn = sqlite3.connect(DB)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    c = conn.cursor()
-
-    # Create playlist table
     c.execute("""
         CREATE TABLE IF NOT EXISTS playlist (
             playlist_id TEXT PRIMARY KEY,
@@ -71,7 +243,9 @@ def init_db():
             channel TEXT,
             thumbnail TEXT,
             video_count INTEGER,
-            hash TEXT
+            hash TEXT,
+            etag TEXT,
+            refreshed_at REAL
         );
     """)
 
@@ -89,10 +263,242 @@ def init_db():
         );
     """)
 
-    # Index to improve performance
+    # Columns added to existing databases
+    playlist_cols = {row[1] for row in c.execute("PRAGMA table_info(playlist);")}
+    if "etag" not in playlist_cols:
+        c.execute("ALTER TABLE playlist ADD COLUMN etag TEXT;")
+    if "refreshed_at" not in playlist_cols:
+        c.execute("ALTER TABLE playlist ADD COLUMN refreshed_at REAL;")
+
+    c.execute("DROP INDEX IF EXISTS play_id_idx;")
+    c.execute("DROP INDEX IF EXISTS vid_id_and_hash_idx;")
+
+    # Playlist pages read videos by position
     c.execute("CREATE INDEX IF NOT EXISTS video_playlist_idx ON video(playlist_id, idx_in_playlist);")
-    conn.commit()
-    conn.close()
+
+
+def migrate_pages(c):
+    """v2: items page ETags (for conditional refresh)."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS playlist_page (
+            playlist_id TEXT NOT NULL,
+            page_token TEXT NOT NULL,
+            etag TEXT,
+            next_token TEXT,
+            vid_ids TEXT,
+            PRIMARY KEY (playlist_id, page_token),
+            FOREIGN KEY (playlist_id) REFERENCES playlist(playlist_id) ON DELETE CASCADE
+        );
+    """)
+
+
+def migrate_fts(c):
+    """v3: full-text search over titles + channels."""
+    for table in ("playlist", "video"):
+        init_fts(c, table)
+
+
+def migrate_thumbs(c):
+    """v4: thumbnail disk cache index (url → content digest)."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS thumb_cache (
+            url TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            mimetype TEXT,
+            size INTEGER,
+            accessed REAL
+        );
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS thumb_cache_accessed_idx ON thumb_cache(accessed);")
+
+
+def migrate_staging(c):
+    """v5: staging tables for streaming sync (one sync_id per running sync)."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS video_staging (
+            sync_id TEXT NOT NULL,
+            vid_id TEXT NOT NULL,
+            playlist_id TEXT,
+            title TEXT,
+            channel TEXT,
+            thumbnail TEXT,
+            idx_in_playlist INTEGER,
+            hash BLOB,
+            PRIMARY KEY (sync_id, vid_id)
+        );
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS page_staging (
+            sync_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            page_token TEXT,
+            etag TEXT,
+            next_token TEXT,
+            vid_ids TEXT,
+            not_modified INTEGER,
+            staged_at REAL,
+            PRIMARY KEY (sync_id, seq)
+        );
+    """)
+
+
+def migrate_integer_keys(c):
+    """
+    v6: explicit INTEGER PRIMARY KEY (id) on playlist and video, used as
+    the FTS rowid. The implicit rowid of a TEXT-keyed table may be
+    renumbered by VACUUM, which silently desyncs the search index.
+    Tables are rebuilt keeping their current rowids as ids.
+    """
+    for table in ("playlist", "video"):
+        for trigger in ("insert", "delete", "update"):
+            c.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger};")
+        c.execute(f"DROP TABLE IF EXISTS {table}_fts;")
+
+    c.execute("""
+        CREATE TABLE playlist_new (
+            id INTEGER PRIMARY KEY,
+            playlist_id TEXT NOT NULL UNIQUE,
+            title TEXT,
+            channel TEXT,
+            thumbnail TEXT,
+            video_count INTEGER,
+            hash TEXT,
+            etag TEXT,
+            refreshed_at REAL
+        );
+    """)
+    c.execute("""
+        INSERT INTO playlist_new
+        SELECT rowid, playlist_id, title, channel, thumbnail, video_count, hash, etag, refreshed_at
+        FROM playlist;
+    """)
+    c.execute("""
+        CREATE TABLE video_new (
+            id INTEGER PRIMARY KEY,
+            vid_id TEXT NOT NULL UNIQUE,
+            playlist_id TEXT NOT NULL,
+            title TEXT,
+            channel TEXT,
+            thumbnail TEXT,
+            idx_in_playlist INTEGER,
+            hash TEXT,
+            FOREIGN KEY (playlist_id) REFERENCES playlist(playlist_id) ON DELETE CASCADE
+        );
+    """)
+    c.execute("""
+        INSERT INTO video_new
+        SELECT rowid, vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash
+        FROM video;
+    """)
+
+    # Foreign keys are off on this connection: dropping cascades nothing
+    c.execute("DROP TABLE video;")
+    c.execute("DROP TABLE playlist;")
+    c.execute("ALTER TABLE playlist_new RENAME TO playlist;")
+    c.execute("ALTER TABLE video_new RENAME TO video;")
+    c.execute("CREATE INDEX video_playlist_idx ON video(playlist_id, idx_in_playlist);")
+
+    for table in ("playlist", "video"):
+        init_fts(c, table, key="id")
+
+
+def migrate_refresh_jobs(c):
+    """
+    v7: refresh jobs shared by all worker processes (status checks may
+    reach any of them), and the time of each playlist's last full crawl.
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS refresh_job (
+            id TEXT PRIMARY KEY,
+            playlist_id TEXT NOT NULL,
+            full INTEGER NOT NULL,
+            source TEXT,
+            status TEXT NOT NULL,
+            queued_at REAL,
+            started_at REAL,
+            finished_at REAL,
+            report TEXT,
+            error TEXT
+        );
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS refresh_job_finished_idx ON refresh_job(finished_at);")
+    c.execute("ALTER TABLE playlist ADD COLUMN full_refreshed_at REAL;")
+
+
+# Schema steps in order; PRAGMA user_version = number of steps applied.
+# Append new steps here, never edit or reorder the old ones.
+MIGRATIONS = [migrate_base, migrate_pages, migrate_fts, migrate_thumbs, migrate_staging,
+              migrate_integer_keys, migrate_refresh_jobs]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def init_db():
+    """
+    Bring the database schema up to SCHEMA_VERSION.
+    - Up to date → a single PRAGMA read, no DDL
+    - Behind → runs the missing migrations in one transaction
+    Safe with several workers starting at once: the version is
+    re-checked under the write lock.
+    """
+    conn = sqlite3.connect(DB, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA user_version;").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            version = conn.execute("PRAGMA user_version;").fetchone()[0]
+            c = conn.cursor()
+            for migrate in MIGRATIONS[version:]:
+                migrate(c)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+            conn.execute("COMMIT;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+    finally:
+        conn.close()
+
+
+def init_fts(c, table, key="rowid"):
+    """
+    Create the FTS5 index <table>_fts over title + channel.
+    The index stores no text of its own (external content); triggers keep
+    it in sync with every insert, update and delete (cascades included).
+    FTS rows are numbered by the table's `key` column (its integer id).
+    Built from existing rows the first time.
+    """
+    exists = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?;", (f"{table}_fts",)
+    ).fetchone()
+    if exists:
+        return
+
+    c.execute(f"""
+        CREATE VIRTUAL TABLE {table}_fts USING fts5(
+            title, channel, content='{table}', content_rowid='{key}'
+        );
+    """)
+    c.execute(f"""
+        CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {table}_fts (rowid, title, channel) VALUES (new.{key}, new.title, new.channel);
+        END;
+    """)
+    c.execute(f"""
+        CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {table}_fts ({table}_fts, rowid, title, channel)
+            VALUES ('delete', old.{key}, old.title, old.channel);
+        END;
+    """)
+    c.execute(f"""
+        CREATE TRIGGER {table}_fts_update AFTER UPDATE OF title, channel ON {table} BEGIN
+            INSERT INTO {table}_fts ({table}_fts, rowid, title, channel)
+            VALUES ('delete', old.{key}, old.title, old.channel);
+            INSERT INTO {table}_fts (rowid, title, channel) VALUES (new.{key}, new.title, new.channel);
+        END;
+    """)
+    c.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild');")
 
 
 # Initialize database at startup
@@ -103,29 +509,36 @@ init_db()
 # Hash Helpers (detect content changes)
 # ===============================
 
+def digest(*fields):
+    """
+    8-byte BLAKE2b digest of the given fields (stored as a BLOB).
+    Only used for change detection, so no cryptographic strength needed.
+    """
+    text = "\x1f".join(str(f) for f in fields)
+    return hashlib.blake2b(text.encode(), digest_size=8).digest()
+
+
 def hash_playlist(playlist):
     """
-    Generate an MD5 hash for a playlist based on its stable fields.
+    Hash a playlist based on its stable fields.
     Used to detect playlist updates.
     """
-    text = (
-        playlist.get("title", "") +
-        playlist.get("thumbnail", "") +
-        str(playlist.get("video_count", ""))
+    return digest(
+        playlist.get("title", ""),
+        playlist.get("thumbnail", ""),
+        playlist.get("video_count", "")
     )
-    return hashlib.md5(text.encode()).hexdigest()
 
 
 def hash_video(video):
     """
-    Generate MD5 hash for a video to detect changes.
+    Hash a video to detect changes.
     """
-    text = (
-        video.get("title", "") +
-        video.get("thumbnail", "") +
-        str(video.get("idx_in_playlist", ""))
+    return digest(
+        video.get("title", ""),
+        video.get("thumbnail", ""),
+        video.get("idx_in_playlist", "")
     )
-    return hashlib.md5(text.encode()).hexdigest()
 
 
 # ===============================
@@ -152,22 +565,362 @@ def extract_playlist_id(url_or_id):
     return params.get("list", [None])[0]
 
 
-def fetch_playlist_details(playlist_id):
+# Thread pool shared by background API calls (keeps per-thread connections warm)
+_fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="yt-fetch")
+_fetch_size = FETCH_WORKERS
+_fetch_demand = 0   # syncs that may run at once (reserved by RefreshQueue, import_playlists)
+_fetch_lock = threading.Lock()
+
+
+def reserve_fetch_capacity(syncs):
+    """
+    Size the fetch pool for `syncs` more concurrent syncs (negative to
+    release). A pipelined sync keeps up to 2 background calls running
+    (details + page producer), so the pool gets 2 threads per sync,
+    never fewer than FETCH_WORKERS. Resizing swaps in a new pool;
+    calls already submitted finish on the old one.
+    """
+    global _fetch_pool, _fetch_size, _fetch_demand
+    with _fetch_lock:
+        _fetch_demand += syncs
+        size = max(FETCH_WORKERS, 2 * _fetch_demand)
+        if size != _fetch_size:
+            old, _fetch_pool = _fetch_pool, ThreadPoolExecutor(max_workers=size, thread_name_prefix="yt-fetch")
+            _fetch_size = size
+            old.shutdown(wait=False)
+
+# Per-thread persistent HTTP connections, keyed by (scheme, host)
+_http = threading.local()
+
+# Marks the end of a page stream
+_DONE = object()
+
+# Returned for conditional requests answered with 304
+NOT_MODIFIED = object()
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all threads.
+    Allows `rate` calls per second with bursts of up to `burst` calls.
+    rate=0 disables limiting.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed."""
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # Reserve a token now, even if it has to be paid back by waiting
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+
+
+api_limiter = RateLimiter(API_RATE_LIMIT, API_BURST)
+
+
+class ApiUnavailable(Exception):
+    """The YouTube API can't be called right now (circuit open or quota spent)."""
+
+
+class QuotaExceeded(ApiUnavailable):
+    """The daily quota is used up."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing API for a while.
+    - closed → calls go through; `threshold` failures in a row open it
+    - open → calls fail fast for `cooldown` seconds
+    - half-open → a single trial call decides between closed and open;
+      other callers wait for its outcome
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial = None     # start of the half-open trial call
+        self._trips = 0
+        self._cond = threading.Condition()
+
+    def allow(self):
+        """Raise ApiUnavailable unless a call may be made now."""
+        if not self.threshold:
+            return
+
+        with self._cond:
+            while self._opened_at is not None:
+                now = time.monotonic()
+                wait = self._opened_at + self.cooldown - now
+                if wait > 0:
+                    raise ApiUnavailable(f"YouTube API circuit open, retry in {wait:.1f}s")
+
+                # Half-open: one trial call (another if it never reported back)
+                if self._trial is None or now - self._trial > self.cooldown:
+                    self._trial = now
+                    return
+                self._cond.wait(self._trial + self.cooldown - now)
+
+    def cancel(self):
+        """A call allowed by allow() was not made: free the half-open trial."""
+        with self._cond:
+            if self._trial is not None:
+                self._trial = None
+                self._cond.notify_all()
+
+    def success(self):
+        with self._cond:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = None
+            self._cond.notify_all()
+
+    def failure(self):
+        if not self.threshold:
+            return
+        with self._cond:
+            self._failures += 1
+            if self._trial is not None or (self._opened_at is None and self._failures >= self.threshold):
+                self._opened_at = time.monotonic()
+                self._trips += 1
+            self._trial = None
+            self._cond.notify_all()
+
+    def status(self):
+        with self._cond:
+            if self._opened_at is None:
+                state = "closed"
+            else:
+                state = "open" if self._trial is None else "half-open"
+            return {"state": state, "failures": self._failures, "trips": self._trips}
+
+
+class QuotaTracker:
+    """
+    Counts YouTube API quota units, per day and per playlist.
+    The daily budget resets at midnight Pacific time (as YouTube's does,
+    ignoring daylight saving); budget=0 disables the limit.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self._day = None
+        self._used = 0
+        self._exhausted = False
+        self._playlists = {}   # playlist_id → units (since start)
+        self._stats = {"calls": 0, "retries": 0, "errors": 0, "timeouts": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        day = datetime.now(QUOTA_TZ).date()
+        if day != self._day:
+            self._day, self._used, self._exhausted = day, 0, False
+
+    def charge(self, playlist_id, units):
+        """Book units for a call about to be made; raises QuotaExceeded when spent."""
+        with self._lock:
+            self._roll()
+            if self._exhausted or (self.budget and self._used + units > self.budget):
+                self._stats["rejected"] += 1
+                raise QuotaExceeded(f"YouTube API daily quota spent ({self._used} units)")
+
+            self._used += units
+            self._stats["calls"] += 1
+            if playlist_id:
+                self._playlists[playlist_id] = self._playlists.get(playlist_id, 0) + units
+
+    def exhausted(self):
+        """YouTube reported quotaExceeded: stop calling until the next day."""
+        with self._lock:
+            self._roll()
+            self._exhausted = True
+
+    def count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def spent(self, playlist_id):
+        """Units spent on a playlist since the process started."""
+        with self._lock:
+            return self._playlists.get(playlist_id, 0)
+
+    def status(self, top=20):
+        with self._lock:
+            self._roll()
+            busiest = sorted(self._playlists.items(), key=lambda kv: kv[1], reverse=True)[:top]
+            return {
+                "day": self._day.isoformat(),
+                "used": self._used,
+                "budget": self.budget,
+                "exhausted": self._exhausted,
+                **self._stats,
+                "playlists": dict(busiest),
+            }
+
+
+api_breaker = CircuitBreaker(API_BREAKER_THRESHOLD, API_BREAKER_COOLDOWN)
+api_quota = QuotaTracker(API_DAILY_QUOTA)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Seconds to wait before retry number `attempt` (0-based):
+    exponential with full jitter, or the server's Retry-After if longer.
+    """
+    delay = random.uniform(0, min(API_BACKOFF_MAX, API_BACKOFF * 2 ** attempt))
+    try:
+        return min(API_BACKOFF_MAX, max(delay, float(retry_after)))
+    except (TypeError, ValueError):
+        return delay
+
+
+def is_quota_error(status, body):
+    """403 responses whose error reason is a quota one."""
+    if status != 403:
+        return False
+    try:
+        errors = json.loads(body)["error"]["errors"]
+    except (ValueError, KeyError, TypeError):
+        return False
+    return any(e.get("reason") in ("quotaExceeded", "dailyLimitExceeded") for e in errors)
+
+
+def send_request(url, path, headers):
+    """
+    Send one GET on the calling thread's kept-alive connection.
+    Returns (response, body). A connection the server already closed
+    is replaced and the request re-sent once.
+    """
+    conns = getattr(_http, "conns", None)
+    if conns is None:
+        conns = _http.conns = {}
+    key = (url.scheme, url.netloc)
+
+    for attempt in range(2):
+        conn = conns.get(key)
+        reused = conn is not None
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            conn = conns[key] = conn_cls(url.netloc, timeout=API_TIMEOUT)
+
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            return resp, resp.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            del conns[key]
+            if attempt or not reused or isinstance(e, TimeoutError):
+                raise
+
+
+def api_get(endpoint, params, etag=None):
+    """
+    GET a YouTube API endpoint and return the decoded JSON response.
+    Connections are kept alive and reused by the calling thread.
+    - etag given → sent as If-None-Match, returns NOT_MODIFIED on 304
+    - response ETag is stored under data["etag"]
+    - timeouts, connection errors, 5xx and 429 are retried with backoff
+    - quota units are booked per playlist (id / playlistId param)
+    Raises urllib.error.HTTPError on 4xx/5xx responses (after retries),
+    ApiUnavailable when the circuit is open or the quota is spent.
+    """
+    url = urllib.parse.urlsplit(f"{API_BASE}/{endpoint}")
+    path = f"{url.path}?{urllib.parse.urlencode(params)}"
+    playlist_id = params.get("playlistId") or params.get("id")
+
+    headers = {"Connection": "keep-alive"}
+    if etag:
+        headers["If-None-Match"] = etag
+
+    attempt = 0
+    while True:
+        # Quota is booked last: calls the breaker rejects send nothing
+        api_breaker.allow()
+        api_limiter.acquire()
+        try:
+            api_quota.charge(playlist_id, API_COST.get(endpoint, 1))
+        except QuotaExceeded:
+            api_breaker.cancel()
+            raise
+
+        retry_after = None
+        try:
+            resp, body = send_request(url, path, headers)
+        except (http.client.HTTPException, OSError) as e:
+            api_quota.count("timeouts" if isinstance(e, TimeoutError) else "errors")
+            error = e
+        else:
+            if resp.status == 304:
+                api_breaker.success()
+                return NOT_MODIFIED
+
+            if resp.status < 400:
+                api_breaker.success()
+                data = json.loads(body)
+                data["etag"] = resp.getheader("ETag") or data.get("etag")
+                return data
+
+            error = urllib.error.HTTPError(
+                f"{url.scheme}://{url.netloc}{path}", resp.status, resp.reason, resp.headers, None
+            )
+            if is_quota_error(resp.status, body):
+                api_quota.exhausted()
+                raise QuotaExceeded("YouTube API daily quota exceeded") from error
+            if resp.status < 500 and resp.status != 429:
+                api_breaker.success()   # the API is up, the request was bad
+                raise error
+
+            api_quota.count("errors")
+            retry_after = resp.getheader("Retry-After")
+
+        # Transient failure (timeout, connection error, 5xx, 429)
+        api_breaker.failure()
+        if attempt >= API_RETRIES:
+            raise error
+
+        time.sleep(backoff_delay(attempt, retry_after))
+        attempt += 1
+        api_quota.count("retries")
+
+
+def best_thumbnail(snippet):
+    """Pick best quality thumbnail URL available in a snippet."""
+    thumbs = snippet.get("thumbnails", {})
+    return (thumbs.get("medium") or thumbs.get("high") or thumbs.get("default") or {"url": ""})["url"]
+
+
+def fetch_playlist_details(playlist_id, etag=None):
     """
     Fetch playlist metadata (title, channel, thumbnail, video count).
-    Returns a dictionary or None on failure.
+    Returns a dictionary, None on failure,
+    or NOT_MODIFIED when etag still matches.
     """
-    base_url = "https://www.googleapis.com/youtube/v3/playlists"
-    params = {
+    data = api_get("playlists", {
         "part": "snippet,contentDetails",
         "id": playlist_id,
         "key": API_KEY
-    }
-
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
+    }, etag=etag)
 
-    with urllib.request.urlopen(url) as resp:
-        data = json.loads(resp.read().decode())
+    if data is NOT_MODIFIED:
+        return NOT_MODIFIED
 
     if not data.get("items"):
         return None
@@ -176,669 +929,1382 @@ def fetch_playlist_details(playlist_id):
     snippet = item["snippet"]
     content = item["contentDetails"]
 
-    # Pick best quality thumbnail available
-    thumbs = snippet.get("thumbnails", {})
-    thumb_url = (thumbs.get("medium") or thumbs.get("high") or thumbs.get("default") or {"url": ""})["url"]
-
     playlist = {
         "playlist_id": playlist_id,
         "title": snippet.get("title", ""),
         "channel": snippet.get("channelTitle", "Unknown"),
-        "thumbnail": thumb_url,
+        "thumbnail": best_thumbnail(snippet),
         "video_count": content.get("itemCount", 0),
+        "etag": data["etag"],
     }
 
     playlist["hash"] = hash_playlist(playlist)
     return playlist
 
 
-def fetch_playlist_items(playlist_id):
+def iter_playlist_pages(playlist_id, known_pages=None):
     """
-    Fetch all videos inside a playlist (auto handles pagination).
-    Returns list of video dictionaries.
+    Yield playlistItems pages in order (auto handles pagination).
+    Each page is a dict: token, etag, next_token, items, not_modified.
+
+    known_pages ({page_token: stored page}) turns on conditional requests:
+    pages answered with 304 come back with not_modified=True, no items,
+    and the stored vid_ids.
+
+    In "pipelined" mode a background thread fetches the next page
+    while the caller is still processing the current one.
     """
-    base_url = "https://www.googleapis.com/youtube/v3/playlistItems"
-    videos = []
-    next_page = None
+    known_pages = known_pages or {}
 
-    while True:
+    def fetch_page(page_token):
         params = {
             "part": "snippet,contentDetails",
             "playlistId": playlist_id,
             "maxResults": 50,
             "key": API_KEY
         }
+        if page_token:
+            params["pageToken"] = page_token
 
-        if next_page:
-            params["pageToken"] = next_page
-
-        url = f"{base_url}?{urllib.parse.urlencode(params)}"
-        with urllib.request.urlopen(url) as resp:
-            data = json.loads(resp.read().decode())
+        known = known_pages.get(page_token)
+        data = api_get("playlistItems", params, etag=known and known["etag"])
 
-        for item in data.get("items", []):
-            snippet = item["snippet"]
-            content = item["contentDetails"]
+        if data is NOT_MODIFIED:
+            return dict(known, token=page_token, items=[], not_modified=True)
 
-            thumbs = snippet.get("thumbnails", {})
-            thumb_url = (thumbs.get("medium") or thumbs.get("high") or thumbs.get("default") or {"url": ""})["url"]
+        return {
+            "token": page_token,
+            "etag": data["etag"],
+            "next_token": data.get("nextPageToken"),
+            "items": data.get("items", []),
+            "not_modified": False,
+        }
 
-            vid_id = content.get("videoId") or snippet.get("resourceId", {}).get("videoId")
-            if not vid_id:
+    if FETCH_MODE == "sequential":
+        next_page = ""
+        while True:
+            page = fetch_page(next_page)
+            yield page
+            next_page = page["next_token"]
+            if not next_page:
+                return
+
+    pages = queue.Queue(maxsize=PAGE_PREFETCH)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up if the consumer stopped reading
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
                 continue
+        return False
 
-            video = {
-                "vid_id": vid_id,
-                "playlist_id": playlist_id,
-                "title": snippet.get("title", ""),
-                "channel": snippet.get("channelTitle", ""),
-                "thumbnail": thumb_url,
-                "idx_in_playlist": snippet.get("position", 0)
-            }
-
-            video["hash"] = hash_video(video)
-            videos.append(video)
+    def producer():
+        try:
+            next_page = ""
+            while True:
+                page = fetch_page(next_page)
+                if not put(page):
+                    return
+                next_page = page["next_token"]
+                if not next_page:
+                    break
+        except Exception as e:
+            put(e)
+            return
+        put(_DONE)
+
+    _fetch_pool.submit(producer)
+
+    try:
+        while True:
+            item = pages.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def parse_playlist_item(item, playlist_id):
+    """
+    Build a video dictionary from a playlistItems entry.
+    Returns None for entries without a video id (deleted/private).
+    """
+    snippet = item["snippet"]
+    content = item["contentDetails"]
 
-        next_page = data.get("nextPageToken")
-        if not next_page:
-            break
+    vid_id = content.get("videoId") or snippet.get("resourceId", {}).get("videoId")
+    if not vid_id:
+        return None
 
-    return videos
+    video = {
+        "vid_id": vid_id,
+        "playlist_id": playlist_id,
+        "title": snippet.get("title", ""),
+        "channel": snippet.get("channelTitle", ""),
+        "thumbnail": best_thumbnail(snippet),
+        "idx_in_playlist": snippet.get("position", 0)
+    }
 
+    video["hash"] = hash_video(video)
+    return video
 
-# ===============================
-# Playlist & Video Database Management
-# ===============================
 
-def manage_playlist(playlist, videos, update=False):
+def iter_playlist_videos(playlist_id):
     """
-    Insert or update a playlist and its videos.
-    - update=True → UPDATE existing playlist
-    - update=False → INSERT new playlist
+    Stream video dictionaries page by page as they arrive.
     """
-    if not playlist:
-        return False
+    for page in iter_playlist_pages(playlist_id):
+        for item in page["items"]:
+            video = parse_playlist_item(item, playlist_id)
+            if video:
+                yield video
 
-    if update:
-        # Update playlist details
-        query = """
-            UPDATE playlist SET
-                title=?, thumbnail=?, video_count=?, hash=?
-            WHERE playlist_id=?;
-        """
-        params = (
-            playlist["title"], playlist["thumbnail"],
-            playlist["video_count"], playlist["hash"],
-            playlist["playlist_id"]
-        )
-        run_query(query, params, commit=True)
 
-        # Handle video differences
-        manage_videos(videos, playlist["playlist_id"])
-        return True
+def fetch_playlist_items(playlist_id):
+    """
+    Fetch all videos inside a playlist (auto handles pagination).
+    Returns list of video dictionaries.
+    """
+    return list(iter_playlist_videos(playlist_id))
+
 
-    # Insert new playlist
-    insert_query = """
-        INSERT INTO playlist (playlist_id, title, channel, thumbnail, video_count, hash)
-        VALUES (?, ?, ?, ?, ?, ?);
+def crawl_playlist_pages(playlist_id, known_pages=None):
     """
-    params = (
-        playlist["playlist_id"], playlist["title"], playlist["channel"],
-        playlist["thumbnail"], playlist["video_count"], playlist["hash"]
-    )
-    run_query(insert_query, params, commit=True)
-
-    # Insert all videos
-    for v in videos:
-        run_query("""
-            INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?);
-        """, (
-            v["vid_id"], v["playlist_id"], v["title"], v["channel"],
-            v["thumbnail"], v["idx_in_playlist"], v["hash"]
-        ), commit=True)
+    Fetch all items pages, skipping unchanged ones when known_pages is given.
+    Returns (videos, pages): videos from changed pages only,
+    pages with their vid_ids for storing in playlist_page.
+    """
+    videos = []
+    pages = []
 
-    return True
+    for page in iter_playlist_pages(playlist_id, known_pages):
+        if not page["not_modified"]:
+            page["vid_ids"] = []
+            for item in page["items"]:
+                video = parse_playlist_item(item, playlist_id)
+                if video:
+                    videos.append(video)
+                    page["vid_ids"].append(video["vid_id"])
 
+        del page["items"]
+        pages.append(page)
 
-def manage_videos(videos, playlist_id):
+    return videos, pages
+
+
+def fetch_playlist(playlist_id):
     """
-    Sync fetched videos with stored videos:
-    - Insert missing videos
-    - Update modified videos
-    - Delete removed videos
+    Fetch playlist details and all its videos.
+    Details are requested alongside the first items page.
+    Returns (playlist, videos, pages).
     """
-    fetched_data = {v["vid_id"]: v for v in videos}
-    fetched_ids = set(fetched_data.keys())
+    if FETCH_MODE == "sequential":
+        return (fetch_playlist_details(playlist_id),) + crawl_playlist_pages(playlist_id)
 
-    # Get stored videos
-    rows = run_query("SELECT vid_id, hash FROM video WHERE playlist_id=?", (playlist_id,))
-    if rows is None:
-        return
-
-    stored_ids = {r["vid_id"] for r in rows}
-    stored_hash = {r["vid_id"]: r["hash"] for r in rows}
-
-    # 1. Insert new videos
-    for vid in fetched_ids - stored_ids:
-        v = fetched_data[vid]
-        run_query("""
-            INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?);
-        """, (
-            v["vid_id"], v["playlist_id"], v["title"], v["channel"],
-            v["thumbnail"], v["idx_in_playlist"], v["hash"]
-        ), commit=True)
-
-    # 2. Update changed videos
-    for vid in fetched_ids & stored_ids:
-        v = fetched_data[vid]
-        if stored_hash.get(vid) != v["hash"]:
-            run_query("""
-                UPDATE video SET
-                    title=?, thumbnail=?, idx_in_playlist=?, hash=?
-                WHERE vid_id=?;
-            """, (
-                v["title"], v["thumbnail"], v["idx_in_playlist"], v["hash"], vid
-            ), commit=True)
-
-    # 3. Delete removed videos
-    for vid in stored_ids - fetched_ids:
-        run_query("DELETE FROM video WHERE vid_id=?", (vid,), commit=True)
+    details = _fetch_pool.submit(fetch_playlist_details, playlist_id)
+    videos, pages = crawl_playlist_pages(playlist_id)
+    return details.result(), videos, pages
 
 
 # ===============================
-# Flask Routes
+# Playlist & Video Database Management
 # ===============================
 
-@app.route("/")
-def index():
-    """Show all saved playlists."""
-    rows = run_query("SELECT * FROM playlist;")
-    return render_template("index.html", playlists=rows or [])
+# Insert new videos and overwrite changed ones, from the fetched_video temp table.
+# Rows owned by another playlist (vid_id is global) are left untouched.
+VIDEO_UPSERT = """
+    INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash)
+    SELECT f.vid_id, f.playlist_id, f.title, f.channel, f.thumbnail, f.idx_in_playlist, f.hash
+    FROM temp.fetched_video f LEFT JOIN video v ON v.vid_id = f.vid_id
+    WHERE v.hash IS NOT f.hash
+    ON CONFLICT(vid_id) DO UPDATE SET
+        title=excluded.title, thumbnail=excluded.thumbnail,
+        idx_in_playlist=excluded.idx_in_playlist, hash=excluded.hash
+    WHERE video.playlist_id = excluded.playlist_id;
+"""
+
+
+def manage_playlist(playlist, videos, pages=None):
+    """
+    Insert or update a playlist and sync its videos.
+    The whole diff is applied in a single transaction.
+    - pages given → page ETags are stored, and videos on
+      not-modified pages are kept as they are
+    """
+    if not playlist:
+        return False
+
+    keep_ids = set()
+    for page in pages or []:
+        if page["not_modified"]:
+            keep_ids.update(page["vid_ids"])
+
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO playlist (playlist_id, title, channel, thumbnail, video_count, hash, etag, refreshed_at)
+            VALUES (:playlist_id, :title, :channel, :thumbnail, :video_count, :hash, :etag, :refreshed_at)
+            ON CONFLICT(playlist_id) DO UPDATE SET
+                title=excluded.title, thumbnail=excluded.thumbnail,
+                video_count=excluded.video_count, hash=excluded.hash,
+                etag=excluded.etag, refreshed_at=excluded.refreshed_at;
+        """, dict(playlist, etag=playlist.get("etag"), refreshed_at=time.time()))
+
+        manage_videos(videos, playlist["playlist_id"], conn, keep_ids)
+
+        if pages is not None:
+            conn.execute("DELETE FROM playlist_page WHERE playlist_id=?", (playlist["playlist_id"],))
+            conn.executemany("""
+                INSERT INTO playlist_page (playlist_id, page_token, etag, next_token, vid_ids)
+                VALUES (?, ?, ?, ?, ?);
+            """, [
+                (playlist["playlist_id"], p["token"], p["etag"], p["next_token"], json.dumps(p["vid_ids"]))
+                for p in pages
+            ])
+
+    # Pages showing this playlist are now stale
+    page_cache.invalidate(playlist["playlist_id"], "index")
+
+    prefetch_thumbnails([playlist["thumbnail"]] + [v["thumbnail"] for v in videos])
+    return True
 
 
-@app.route("/add_playlist", methods=["POST"])
-def add_playlist():
+def manage_videos(videos, playlist_id, conn, keep_ids=()):
     """
-    Add a new playlist or refresh an existing one.
-    Automatically extracts ID from URL.
+    Sync fetched videos with stored videos on an open connection:
+    - Insert missing videos
+    - Update modified videos
+    - Delete removed videos (except keep_ids)
+    Fetched rows are loaded into temp tables and diffed in SQL.
+    Returns (upserted, deleted) row counts.
+    """
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS fetched_video (
+            vid_id TEXT PRIMARY KEY, playlist_id TEXT, title TEXT, channel TEXT,
+            thumbnail TEXT, idx_in_playlist INTEGER, hash BLOB
+        );
+    """)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS kept_video (vid_id TEXT PRIMARY KEY);")
+
+    try:
+        conn.executemany("""
+            INSERT OR REPLACE INTO temp.fetched_video
+            VALUES (:vid_id, :playlist_id, :title, :channel, :thumbnail, :idx_in_playlist, :hash);
+        """, videos)
+        conn.executemany("INSERT OR IGNORE INTO temp.kept_video VALUES (?);", ((vid,) for vid in keep_ids))
+
+        # 1 + 2. Insert new and update changed videos
+        upserted = conn.execute(VIDEO_UPSERT).rowcount
+
+        # 3. Delete removed videos
+        deleted = conn.execute("""
+            DELETE FROM video
+            WHERE playlist_id=?
+              AND vid_id NOT IN (SELECT vid_id FROM temp.fetched_video)
+              AND vid_id NOT IN (SELECT vid_id FROM temp.kept_video);
+        """, (playlist_id,)).rowcount
+    finally:
+        conn.execute("DELETE FROM temp.fetched_video;")
+        conn.execute("DELETE FROM temp.kept_video;")
+
+    return upserted, deleted
+
+
+# Insert new and overwrite changed videos from one staged sync (see VIDEO_UPSERT).
+STAGED_UPSERT = """
+    INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash)
+    SELECT s.vid_id, s.playlist_id, s.title, s.channel, s.thumbnail, s.idx_in_playlist, s.hash
+    FROM video_staging s LEFT JOIN video v ON v.vid_id = s.vid_id
+    WHERE s.sync_id = ? AND v.hash IS NOT s.hash
+    ON CONFLICT(vid_id) DO UPDATE SET
+        title=excluded.title, thumbnail=excluded.thumbnail,
+        idx_in_playlist=excluded.idx_in_playlist, hash=excluded.hash
+    WHERE video.playlist_id = excluded.playlist_id;
+"""
+
+
+class StoredPages:
+    """
+    Stored items pages of a playlist, looked up one at a time
+    (same interface as the dict from load_playlist_pages).
     """
-    URL = request.form.get("url")
-    playlist_id = extract_playlist_id(URL)
-
-    playlist_data = fetch_playlist_details(playlist_id)
-    videos_data = fetch_playlist_items(playlist_id)
 
-    existing = run_query("SELECT playlist_id FROM playlist WHERE playlist_id=?", (playlist_id,))
-    manage_playlist(playlist_data, videos_data, update=bool(existing))
+    def __init__(self, playlist_id):
+        self.playlist_id = playlist_id
 
-    return redirect("/")
+    def get(self, page_token):
+        rows = run_query(
+            "SELECT etag, next_token, vid_ids FROM playlist_page WHERE playlist_id=? AND page_token=?",
+            (self.playlist_id, page_token)
+        )
+        if not rows:
+            return None
+        return {"etag": rows[0]["etag"], "next_token": rows[0]["next_token"],
+                "vid_ids": json.loads(rows[0]["vid_ids"])}
 
 
-@app.route("/playlist/<playlist_id>")
-def show_playlist(playlist_id):
-    """Show playlist contents (videos list)."""
+def stage_playlist_pages(playlist_id, known_pages=None):
+    """
+    Streaming crawl: write every items page into the staging tables
+    as it arrives, so only about one page is held in memory.
+    Returns a summary: sync_id, pages_fetched, pages_skipped, videos,
+    first_thumbnails (first VIDEO_PAGE_SIZE videos, for prefetching).
+    """
+    sync_id = uuid.uuid4().hex
+    staged = {"sync_id": sync_id, "pages_fetched": 0, "pages_skipped": 0, "videos": 0, "first_thumbnails": []}
+
+    # Leftovers of syncs that crashed mid-way
+    cutoff = time.time() - STAGING_TTL
+    with transaction() as conn:
+        conn.execute("""
+            DELETE FROM video_staging
+            WHERE sync_id IN (SELECT sync_id FROM page_staging WHERE staged_at < ?);
+        """, (cutoff,))
+        conn.execute("DELETE FROM page_staging WHERE staged_at < ?;", (cutoff,))
+
+    try:
+        for seq, page in enumerate(iter_playlist_pages(playlist_id, known_pages)):
+            videos = []
+            if page["not_modified"]:
+                staged["pages_skipped"] += 1
+            else:
+                staged["pages_fetched"] += 1
+                for item in page["items"]:
+                    video = parse_playlist_item(item, playlist_id)
+                    if video:
+                        videos.append(video)
+                page["vid_ids"] = [v["vid_id"] for v in videos]
+
+            with transaction() as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO video_staging
+                    VALUES (:sync_id, :vid_id, :playlist_id, :title, :channel, :thumbnail, :idx_in_playlist, :hash);
+                """, (dict(v, sync_id=sync_id) for v in videos))
+                conn.execute("""
+                    INSERT INTO page_staging VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+                """, (sync_id, seq, page["token"], page["etag"], page["next_token"],
+                      json.dumps(page["vid_ids"]), page["not_modified"], time.time()))
+
+            staged["videos"] += len(videos)
+            room = VIDEO_PAGE_SIZE - len(staged["first_thumbnails"])
+            staged["first_thumbnails"] += [v["thumbnail"] for v in videos[:room]]
+    except BaseException:
+        drop_staged(sync_id)
+        raise
+
+    return staged
+
+
+def drop_staged(sync_id):
+    """Remove the staging rows of a sync."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM video_staging WHERE sync_id=?;", (sync_id,))
+        conn.execute("DELETE FROM page_staging WHERE sync_id=?;", (sync_id,))
+
+
+def apply_staged(playlist, staged):
+    """
+    Reconcile a staged crawl with the stored playlist in one transaction
+    (the streaming counterpart of manage_playlist):
+    - upsert the playlist row
+    - insert new / update changed videos from video_staging
+    - delete videos neither staged nor on a not-modified page
+    - replace the stored page ETags
+    Returns (upserted, deleted) video counts.
+    """
+    playlist_id = playlist["playlist_id"]
+    sync_id = staged["sync_id"]
+
+    try:
+        with transaction() as conn:
+            conn.execute("""
+                INSERT INTO playlist (playlist_id, title, channel, thumbnail, video_count, hash, etag, refreshed_at)
+                VALUES (:playlist_id, :title, :channel, :thumbnail, :video_count, :hash, :etag, :refreshed_at)
+                ON CONFLICT(playlist_id) DO UPDATE SET
+                    title=excluded.title, thumbnail=excluded.thumbnail,
+                    video_count=excluded.video_count, hash=excluded.hash,
+                    etag=excluded.etag, refreshed_at=excluded.refreshed_at;
+            """, dict(playlist, etag=playlist.get("etag"), refreshed_at=time.time()))
+
+            upserted = conn.execute(STAGED_UPSERT, (sync_id,)).rowcount
+
+            deleted = conn.execute("""
+                DELETE FROM video
+                WHERE playlist_id=?
+                  AND vid_id NOT IN (SELECT vid_id FROM video_staging WHERE sync_id=?)
+                  AND vid_id NOT IN (
+                      SELECT j.value FROM page_staging p, json_each(p.vid_ids) j
+                      WHERE p.sync_id=? AND p.not_modified
+                  );
+            """, (playlist_id, sync_id, sync_id)).rowcount
+
+            conn.execute("DELETE FROM playlist_page WHERE playlist_id=?", (playlist_id,))
+            conn.execute("""
+                INSERT INTO playlist_page (playlist_id, page_token, etag, next_token, vid_ids)
+                SELECT ?, page_token, etag, next_token, vid_ids FROM page_staging WHERE sync_id=?;
+            """, (playlist_id, sync_id))
+
+            conn.execute("DELETE FROM video_staging WHERE sync_id=?;", (sync_id,))
+            conn.execute("DELETE FROM page_staging WHERE sync_id=?;", (sync_id,))
+    except BaseException:
+        drop_staged(sync_id)
+        raise
+
+    # Pages showing this playlist are now stale
+    page_cache.invalidate(playlist_id, "index")
+
+    prefetch_thumbnails([playlist["thumbnail"]] + staged["first_thumbnails"])
+    return upserted, deleted
+
+
+def load_playlist_pages(playlist_id):
+    """Stored items pages of a playlist, keyed by page token."""
     rows = run_query(
-        "SELECT * FROM video WHERE playlist_id=? ORDER BY idx_in_playlist ASC;",
+        "SELECT page_token, etag, next_token, vid_ids FROM playlist_page WHERE playlist_id=?",
         (playlist_id,)
     )
-    return render_template("playlist.html", videos=rows or [], playlist_id=playlist_id)
+    return {
+        r["page_token"]: {
+            "etag": r["etag"],
+            "next_token": r["next_token"],
+            "vid_ids": json.loads(r["vid_ids"]),
+        }
+        for r in rows
+    }
 
 
-@app.route("/playlist/<playlist_id>/refresh")
-def refresh_playlist(playlist_id):
-    """
-    Refresh playlist: re-fetch metadata + items, apply update logic.
+def sync_playlist(playlist_id, full=False):
     """
-    playlist_data = fetch_playlist_details(playlist_id)
-    videos_data = fetch_playlist_items(playlist_id)
-
-    manage_playlist(playlist_data, videos_data, update=True)
-    return redirect(url_for("show_playlist", playlist_id=playlist_id))
+    Fetch a playlist from YouTube and store it.
 
+    Playlists already stored are refreshed incrementally
+    (unless full=True or REFRESH_MODE="full"):
+    - playlist ETag still matches, or hash unchanged → item crawl skipped
+    - otherwise items pages are requested with their ETags,
+      and pages answered with 304 are not re-parsed or re-synced
 
-@app.route("/delete/<playlist_id>")
-def delete_playlist(playlist_id):
-    """Delete playlist + its videos (cascade)."""
-    run_query("DELETE FROM playlist WHERE playlist_id=?", (playlist_id,), commit=True)
-    return redirect("/")
+    SYNC_MODE="streaming" stages pages in SQLite as they arrive
+    (flat memory); "batch" keeps the whole playlist in memory.
 
+    Returns a report of what was fetched and skipped,
+    and the API quota units it cost.
+    """
+    quota_start = api_quota.spent(playlist_id)
+    stored = run_query("SELECT hash, etag FROM playlist WHERE playlist_id=?", (playlist_id,))
+    incremental = bool(stored) and not full and REFRESH_MODE == "incremental"
+    streaming = SYNC_MODE == "streaming"
 
-@app.route("/video/<video_id>")
-def show_video(video_id):
-    """Show a single video page."""
-    playlist_id = request.args.get("playlist_id")
-    return render_template("video.html", vid_id=video_id, playlist_id=playlist_id)
+    report = {
+        "playlist_id": playlist_id,
+        "mode": "incremental" if incremental else "full",
+        "sync": "streaming" if streaming else "batch",
+        "playlist": "changed",
+        "crawl_skipped": False,
+        "pages_fetched": 0,
+        "pages_skipped": 0,
+        "videos_fetched": 0,
+        "quota_units": 0,
+    }
 
+    staged = None
+    try:
+        if not incremental:
+            if not streaming:
+                playlist, videos, pages = fetch_playlist(playlist_id)
+            elif FETCH_MODE == "sequential":
+                playlist = fetch_playlist_details(playlist_id)
+                staged = stage_playlist_pages(playlist_id)
+            else:
+                details = _fetch_pool.submit(fetch_playlist_details, playlist_id)
+                staged = stage_playlist_pages(playlist_id)
+                try:
+                    playlist = details.result()
+                except BaseException:
+                    drop_staged(staged["sync_id"])
+                    raise
+        else:
+            stored = stored[0]
+            playlist = fetch_playlist_details(playlist_id, etag=stored["etag"])
+
+            if playlist is NOT_MODIFIED or (playlist and playlist["hash"] == stored["hash"]):
+                report["playlist"] = "not_modified" if playlist is NOT_MODIFIED else "unchanged"
+                report["crawl_skipped"] = True
+                etag = None if playlist is NOT_MODIFIED else playlist["etag"]
+                run_query("UPDATE playlist SET etag=COALESCE(?, etag), refreshed_at=? WHERE playlist_id=?",
+                          (etag, time.time(), playlist_id), commit=True)
+                page_cache.invalidate(playlist_id, "index")
+                report["quota_units"] = api_quota.spent(playlist_id) - quota_start
+                return report
+
+            if streaming:
+                staged = stage_playlist_pages(playlist_id, StoredPages(playlist_id))
+            else:
+                videos, pages = crawl_playlist_pages(playlist_id, load_playlist_pages(playlist_id))
+    except urllib.error.HTTPError as e:
+        # playlistItems answers 404 (playlistNotFound) for unknown or deleted playlists
+        if e.code != 404:
+            raise
+        playlist = None
+
+    report["quota_units"] = api_quota.spent(playlist_id) - quota_start
+    if not playlist:
+        if staged:
+            drop_staged(staged["sync_id"])
+        report["playlist"] = "not_found"
+        return report
+
+    if streaming:
+        report["pages_fetched"] = staged["pages_fetched"]
+        report["pages_skipped"] = staged["pages_skipped"]
+        report["videos_fetched"] = staged["videos"]
+        apply_staged(playlist, staged)
+    else:
+        report["pages_skipped"] = sum(1 for p in pages if p["not_modified"])
+        report["pages_fetched"] = len(pages) - report["pages_skipped"]
+        report["videos_fetched"] = len(videos)
+        manage_playlist(playlist, videos, pages)
 
-@app.route("/back")
-def go_back():
-    """
-    Universal back button logic:
-    - ?home=true → go to homepage
-    - ?playlist=x → go back to playlist x
-    """
-    if request.args.get("home", "false").lower() == "true":
-        return redirect("/")
-    playlist_id = request.args.get("playlist")
-    return redirect(f"/playlist/{playlist_id}" if playlist_id else "/")
+    if not incremental:
+        run_query("UPDATE playlist SET full_refreshed_at=? WHERE playlist_id=?",
+                  (time.time(), playlist_id), commit=True)
+    return report
 
 
 # ===============================
-# Error Handlers
+# Background Refresh
 # ===============================
 
-@app.errorhandler(HTTPException)
-def handle_http_exception(e):
-    """Handle 404, 403, etc."""
-    return render_template("error.html", data={
-        "error": e.name,
-        "code": e.code,
-        "description": e.description
-    }), e.code
-
-
-@app.errorhandler(Exception)
-def handle_generic_exception(e):
-    """Handle unexpected errors."""
-    return render_template("error.html", data={
-        "error": "Internal Server Error",
-        "code": 500,
-        "description": str(e) if current_app.debug else "Something went wrong."
-    }), 500
+class RefreshQueue:
+    """
+    Runs playlist refreshes (sync_playlist) on a bounded worker pool.
+    A playlist has at most one queued/running job per process. Jobs are
+    recorded in the refresh_job table, so any server worker can answer
+    a status check; finished jobs are kept up to JOB_HISTORY.
+    """
 
+    def __init__(self, workers=REFRESH_WORKERS, history=JOB_HISTORY):
+        self.workers = workers
+        self.history = history
+        self._lock = threading.Lock()
+        self._active = {}            # playlist_id → job
+        self._pool = None
+        self._pid = None
+
+    def _executor(self):
+        # Created on first use (and again after a fork)
+        if self._pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="yt-refresh")
+            if self._pid is None:
+                reserve_fetch_capacity(self.workers)
+            self._pid = os.getpid()
+        return self._pool
+
+    def enqueue(self, playlist_id, full=False, source="user"):
+        """Queue a refresh, or return the job already queued for this playlist."""
+        with self._lock:
+            if playlist_id in self._active:
+                return dict(self._active[playlist_id])
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "playlist_id": playlist_id,
+                "full": full,
+                "source": source,
+                "status": "queued",
+                "queued_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "report": None,
+                "error": None,
+            }
+            self._active[playlist_id] = job
+            executor = self._executor()
+
+        self._save(job)
+        executor.submit(self._run, job)
+        return dict(job)
+
+    def _save(self, job):
+        with transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO refresh_job
+                VALUES (:id, :playlist_id, :full, :source, :status,
+                        :queued_at, :started_at, :finished_at, :report, :error);
+            """, dict(job, report=json.dumps(job["report"]) if job["report"] else None))
+
+            if job["status"] in ("done", "failed"):
+                # Drop the oldest finished jobs beyond the history size
+                conn.execute("""
+                    DELETE FROM refresh_job WHERE id IN (
+                        SELECT id FROM refresh_job WHERE finished_at IS NOT NULL
+                        ORDER BY finished_at DESC LIMIT -1 OFFSET ?
+                    );
+                """, (self.history,))
+
+    def _run(self, job):
+        with self._lock:
+            job["status"] = "running"
+            job["started_at"] = time.time()
+        self._save(job)
+
+        try:
+            report = sync_playlist(job["playlist_id"], full=job["full"])
+            status, error = "done", None
+        except Exception as e:
+            app.logger.exception("refresh of %s failed", job["playlist_id"])
+            report, status, error = None, "failed", str(e)
+
+        with self._lock:
+            job.update(status=status, report=report, error=error, finished_at=time.time())
+        try:
+            self._save(job)
+        finally:
+            with self._lock:
+                self._active.pop(job["playlist_id"], None)
+
+    def get(self, job_id):
+        """A job (from any worker process), or None if unknown."""
+        rows = run_query("SELECT * FROM refresh_job WHERE id=?;", (job_id,))
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["full"] = bool(job["full"])
+        job["report"] = json.loads(job["report"]) if job["report"] else None
+        return job
+
+
+refresh_queue = RefreshQueue()
+
+
+def refresh_jitter(playlist_id):
+    """
+    Stable per-playlist delay in [0, REFRESH_JITTER) seconds,
+    so playlists saved together are not refreshed together.
+    """
+    if not REFRESH_JITTER:
+        return 0
+    return zlib.crc32(playlist_id.encode()) % (REFRESH_JITTER * 1000) / 1000
 
-# ===============================
-# Run Server
-# ===============================
 
-if __name__ == "__main__":
-    app.run(debug=True)
-    if commit:
-        conn.commit()
-        conn.close()
-        return True
+def stale_playlists(now=None):
+    """
+    (playlist_id, full) of playlists due for a refresh.
+    full is set when the last full crawl is older than FULL_REFRESH_INTERVAL:
+    incremental refreshes skip the crawl while the playlist hash is
+    unchanged, so a retitled video is only picked up by a full one.
+    """
+    now = now or time.time()
+    rows = run_query("SELECT playlist_id, refreshed_at, full_refreshed_at FROM playlist;")
+    return [
+        (r["playlist_id"],
+         bool(FULL_REFRESH_INTERVAL) and (r["full_refreshed_at"] or 0) + FULL_REFRESH_INTERVAL <= now)
+        for r in rows
+        if (r["refreshed_at"] or 0) + REFRESH_INTERVAL + refresh_jitter(r["playlist_id"]) <= now
+    ]
 
-    rows = cur.fetchall()
-    conn.close()
-    return rows
 
-# -----------------------
-# Initialize DB schema
-# -----------------------
-def init_db():
+def run_scheduler(stop=None):
     """
-    Create playlist and video tables (if they don't exist).
-    Enables foreign key cascade on delete for videos linked to playlist.
+    Queue refreshes for stale playlists every SCHEDULER_TICK seconds,
+    until stop (threading.Event) is set.
     """
-    conn = sqlite3.connect(DB)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    c = conn.cursor()
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            for playlist_id, full in stale_playlists():
+                refresh_queue.enqueue(playlist_id, full=full, source="scheduler")
+        except Exception:
+            app.logger.exception("scheduler scan failed")
+        stop.wait(SCHEDULER_TICK)
 
-    # playlist table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS playlist (
-            playlist_id TEXT PRIMARY KEY,
-            title TEXT,
-            channel TEXT,
-            thumbnail TEXT,
-            video_count INTEGER,
-            hash TEXT
-        );
-    """)
 
-    # video table with foreign key cascade
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS video (
-            vid_id TEXT PRIMARY KEY,
-            playlist_id TEXT NOT NULL,
-            title TEXT,
-            channel TEXT,
-            thumbnail TEXT,
-            idx_in_playlist INTEGER,
-            hash TEXT,
-            FOREIGN KEY (playlist_id) REFERENCES playlist(playlist_id) ON DELETE CASCADE
-        );
-    """)
+def start_scheduler():
+    """
+    Run the scheduler in a daemon thread.
+    Returns the stop event.
+    """
+    stop = threading.Event()
+    threading.Thread(target=run_scheduler, args=(stop,), name="yt-scheduler", daemon=True).start()
+    return stop
 
-    # Useful indexes
-    c.execute("CREATE INDEX IF NOT EXISTS play_id_idx ON playlist(playlist_id, hash);")
-    c.execute("CREATE INDEX IF NOT EXISTS vid_id_and_hash_idx ON video(vid_id, hash);")
 
-    conn.commit()
-    conn.close()
+@app.cli.command("scheduler")
+def scheduler_command():
+    """Run the background refresh scheduler (one per deployment)."""
+    run_scheduler()
 
-# Ensure DB/tables exist before serving
-init_db()
-
-# -----------------------
-# Hash helpers
-# -----------------------
-def hash_playlist(playlist):
-    """Return MD5 hash for playlist using stable fields."""
-    text = (playlist.get("title", "") +
-            playlist.get("thumbnail", "") +
-            str(playlist.get("video_count", "")))
-    return hashlib.md5(text.encode()).hexdigest()
 
+# ===============================
+# Bulk Import
+# ===============================
 
-def hash_video(video):
-    """Return MD5 hash for a video using stable fields."""
-    text = (video.get("title", "") +
-            video.get("thumbnail", "") +
-            str(video.get("idx_in_playlist", "")))
-    return hashlib.md5(text.encode()).hexdigest()
-
-# -----------------------
-# URL / YouTube fetch helpers
-# -----------------------
-def extract_playlist_id(url_or_id):
+def read_playlist_ids(lines, header=False):
     """
-    Given either a full playlist URL or a bare playlist id, return the playlist id or None.
+    Stream unique playlist ids from lines of plain text or CSV.
+    Each row gives its first cell holding a playlist URL or id.
+    Blank lines and lines starting with # are skipped.
     """
-    if not url_or_id:
-        return None
+    rows = csv.reader(
+        line for line in lines
+        if line.strip() and not line.lstrip().startswith("#")
+    )
+    if header:
+        next(rows, None)
+
+    seen = set()
+    for row in rows:
+        for cell in row:
+            playlist_id = extract_playlist_id(cell.strip())
+            if playlist_id:
+                if playlist_id not in seen:
+                    seen.add(playlist_id)
+                    yield playlist_id
+                break
+
+
+def load_checkpoint(path):
+    """Ids already imported (done or not found) according to a checkpoint file."""
+    finished = set()
+    if not path or not os.path.exists(path):
+        return finished
+
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # line cut short by a crash
+            if entry.get("status") in ("done", "not_found"):
+                finished.add(entry["playlist_id"])
+    return finished
+
+
+def import_playlists(playlist_ids, workers=IMPORT_WORKERS, checkpoint=None, log=print):
+    """
+    Import playlists through sync_playlist with at most `workers` in flight.
+    Every finished playlist is appended to the checkpoint file (JSON lines),
+    and ids already finished there are skipped, so a crashed import resumes.
+    Returns throughput stats.
+    """
+    finished = load_checkpoint(checkpoint)
+    stats = {"done": 0, "not_found": 0, "failed": 0, "skipped": 0, "videos": 0}
+    start = time.perf_counter()
+
+    def elapsed():
+        return max(time.perf_counter() - start, 1e-9)
+
+    def collect(futures, out):
+        for future in futures:
+            playlist_id = future.playlist_id
+            try:
+                report = future.result()
+                status = "not_found" if report["playlist"] == "not_found" else "done"
+                entry = {"playlist_id": playlist_id, "status": status, "videos": report["videos_fetched"]}
+                stats["videos"] += report["videos_fetched"]
+            except Exception as e:
+                status = "failed"
+                entry = {"playlist_id": playlist_id, "status": status, "error": str(e)}
+            stats[status] += 1
+
+            if out:
+                out.write(json.dumps(entry) + "\n")
+                out.flush()
+
+            imported = stats["done"] + stats["not_found"] + stats["failed"]
+            if imported % 10 == 0:
+                log(f"{imported} playlists, {imported * 60 / elapsed():.1f}/min, "
+                    f"{stats['videos'] / elapsed():.0f} videos/s")
+
+    out = open(checkpoint, "a+") if checkpoint else None
+    if out and out.tell():
+        # Terminate a line cut short by a crash
+        out.seek(out.tell() - 1)
+        if out.read(1) != "\n":
+            out.write("\n")
+    # Room in the fetch pool for each import worker's background calls
+    reserve_fetch_capacity(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yt-import") as pool:
+            pending = set()
+            for playlist_id in playlist_ids:
+                if playlist_id in finished:
+                    stats["skipped"] += 1
+                    continue
+
+                # Keep memory flat: only a couple of jobs per worker in flight
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done, out)
+
+                future = pool.submit(sync_playlist, playlist_id)
+                future.playlist_id = playlist_id
+                pending.add(future)
+
+            collect(wait(pending).done, out)
+    finally:
+        reserve_fetch_capacity(-workers)
+        if out:
+            out.close()
+
+    stats["seconds"] = round(elapsed(), 3)
+    stats["playlists_per_min"] = round((stats["done"] + stats["not_found"]) * 60 / elapsed(), 2)
+    stats["videos_per_sec"] = round(stats["videos"] / elapsed(), 2)
+    return stats
+
+
+@app.cli.command("import-playlists")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", default=IMPORT_WORKERS, show_default=True, help="Playlists imported at the same time.")
+@click.option("--checkpoint", help="Progress file (default: <path>.checkpoint).")
+@click.option("--header", is_flag=True, help="Skip the first row (CSV header).")
+def import_command(path, workers, checkpoint, header):
+    """Import playlist URLs/ids from a text or CSV file."""
+    checkpoint = checkpoint or f"{path}.checkpoint"
+
+    with open(path, newline="") as f:
+        stats = import_playlists(read_playlist_ids(f, header), workers, checkpoint, log=click.echo)
+
+    click.echo(
+        f"imported {stats['done']}, not found {stats['not_found']}, failed {stats['failed']}, "
+        f"skipped {stats['skipped']} (checkpoint) in {stats['seconds']}s → "
+        f"{stats['playlists_per_min']} playlists/min, {stats['videos_per_sec']} videos/s"
+    )
 
-    # If user provided a bare id (no scheme) and looks long enough, accept it
-    if "://" not in url_or_id and len(url_or_id) >= 8:
-        return url_or_id.strip()
 
-    parsed = urllib.parse.urlparse(url_or_id)
-    params = urllib.parse.parse_qs(parsed.query)
-    playlist_id = params.get("list", [None])[0]
-    return playlist_id
+# ===============================
+# Page Cache
+# ===============================
 
+class PageCache:
+    """
+    LRU cache of rendered pages, bounded by total size in bytes.
+    Each entry is tagged with a playlist id ("index" for the home page)
+    so a write can drop every page that shows that playlist.
+    """
 
-def fetch_playlist_details(playlist_id):
+    def __init__(self, max_bytes=PAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key → (tag, body)
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key, tag, body):
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= len(old[1])
+
+            self._entries[key] = (tag, body)
+            self._bytes += len(body)
+
+            # Evict least recently used pages until under budget
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *tags):
+        """Drop all pages with any of the given tags."""
+        with self._lock:
+            for key in [k for k, (tag, _) in self._entries.items() if tag in tags]:
+                self._bytes -= len(self._entries.pop(key)[1])
+                self._stats["invalidations"] += 1
+
+    def status(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+page_cache = PageCache()
+
+# Changes whenever templates change, so browsers don't keep old markup
+TEMPLATE_VERSION = max(
+    (os.path.getmtime(os.path.join(app.root_path, "templates", f))
+     for f in os.listdir(os.path.join(app.root_path, "templates"))),
+    default=0
+)
+
+
+def cached_page(tag, key, last_modified, render):
     """
-    Fetch playlist metadata from YouTube API.
-    Returns dict or None on failure.
+    Serve a page from page_cache, rendering it only on a miss.
+    The response carries an ETag derived from the key and a
+    Last-Modified time, so browsers can revalidate and get a 304
+    (answered before anything is rendered).
     """
-    base_url = "https://www.googleapis.com/youtube/v3/playlists"
-    params = {
-        "part": "snippet,contentDetails",
-        "id": playlist_id,
-        "key": API_KEY
-    }
+    etag = hashlib.md5(repr((TEMPLATE_VERSION,) + key).encode()).hexdigest()
 
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
-    with urllib.request.urlopen(url) as resp:
-        data = json.loads(resp.read().decode())
+    if request.if_none_match.contains(etag):
+        body = b""
+    else:
+        body = page_cache.get(key)
+        if body is None:
+            body = render().encode()
+            page_cache.put(key, tag, body)
 
-    if not data.get("items"):
-        return None
+    resp = make_response(body)
+    resp.set_etag(etag)
+    resp.cache_control.no_cache = True
+    if last_modified:
+        resp.last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+    return resp.make_conditional(request)
 
-    item = data["items"][0]
-    snippet = item.get("snippet", {})
-    content = item.get("contentDetails", {})
 
-    thumbs = snippet.get("thumbnails", {})
-    thumb_url = (thumbs.get("medium") or
-                 thumbs.get("high") or
-                 thumbs.get("default") or {"url": ""})["url"]
+# ===============================
+# Thumbnail Cache
+# ===============================
 
-    playlist = {
-        "playlist_id": item.get("id"),
-        "title": snippet.get("title", ""),
-        "channel": snippet.get("channelTitle", "Unknown"),
-        "thumbnail": thumb_url,
-        "video_count": content.get("itemCount", 0),
-    }
+# Thread pool for background thumbnail downloads
+_thumb_pool = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="yt-thumb")
 
-    playlist["hash"] = hash_playlist(playlist)
-    return playlist
 
+def thumb_path(digest_hex):
+    """Content-addressed file path of a cached image."""
+    return os.path.abspath(os.path.join(THUMB_DIR, digest_hex[:2], digest_hex))
 
-def fetch_playlist_items(playlist_id):
+
+def downscale(data, mimetype):
     """
-    Fetch all playlist items with pagination.
+    Shrink an image to THUMB_WIDTH pixels wide (JPEG).
+    Returned unchanged when Pillow isn't installed or the image is small enough.
     """
-    base_url = "https://www.googleapis.com/youtube/v3/playlistItems"
-    videos = []
-    next_page = None
-
-    while True:
-        params = {
-            "part": "snippet,contentDetails",
-            "playlistId": playlist_id,
-            "maxResults": 50,
-            "key": API_KEY
-        }
-
-        if next_page:
-            params["pageToken"] = next_page
+    if not (Image and THUMB_WIDTH):
+        return data, mimetype
 
-        url = f"{base_url}?{urllib.parse.urlencode(params)}"
-        with urllib.request.urlopen(url) as resp:
-            data = json.loads(resp.read().decode())
+    try:
+        img = Image.open(io.BytesIO(data))
+        if img.width <= THUMB_WIDTH:
+            return data, mimetype
 
-        for item in data.get("items", []):
-            snippet = item.get("snippet", {})
-            content = item.get("contentDetails", {})
+        img.thumbnail((THUMB_WIDTH, img.height))
+        out = io.BytesIO()
+        img.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+        return out.getvalue(), "image/jpeg"
+    except (OSError, ValueError):
+        return data, mimetype
 
-            thumbs = snippet.get("thumbnails", {})
-            thumb_url = (thumbs.get("medium") or
-                         thumbs.get("high") or
-                         thumbs.get("default") or {"url": ""})["url"]
 
-            vid_id = (content.get("videoId") or
-                      snippet.get("resourceId", {}).get("videoId"))
+def cache_thumbnail(url):
+    """
+    Return the cache entry (digest, mimetype) of a thumbnail URL,
+    downloading it on a miss. Returns None if it can't be downloaded.
+    """
+    rows = run_query("SELECT digest, mimetype, accessed FROM thumb_cache WHERE url=?", (url,))
+    if rows and os.path.exists(thumb_path(rows[0]["digest"])):
+        entry = rows[0]
+        # Access times only need to be rough for LRU eviction
+        if time.time() - entry["accessed"] > THUMB_TOUCH_INTERVAL:
+            run_query("UPDATE thumb_cache SET accessed=? WHERE url=?", (time.time(), url), commit=True)
+        return {"digest": entry["digest"], "mimetype": entry["mimetype"]}
+
+    try:
+        with urllib.request.urlopen(url, timeout=THUMB_TIMEOUT) as resp:
+            data = resp.read()
+            mimetype = resp.headers.get_content_type()
+    except (OSError, ValueError, http.client.HTTPException):
+        # HTTPException: truncated or malformed response (e.g. IncompleteRead)
+        return None
 
-            if not vid_id:
-                continue
+    data, mimetype = downscale(data, mimetype)
+    if len(data) > THUMB_CACHE_BYTES:
+        return None
+    digest_hex = hashlib.sha256(data).hexdigest()
+    path = thumb_path(digest_hex)
 
-            vid = {
-                "vid_id": vid_id,
-                "playlist_id": playlist_id,
-                "title": snippet.get("title", ""),
-                "channel": snippet.get("channelTitle", ""),
-                "thumbnail": thumb_url,
-                "idx_in_playlist": snippet.get("position", 0),
-            }
+    # Same content under another URL is stored once
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
 
-            vid["hash"] = hash_video(vid)
-            videos.append(vid)
+    run_query("""
+        INSERT OR REPLACE INTO thumb_cache (url, digest, mimetype, size, accessed)
+        VALUES (?, ?, ?, ?, ?);
+    """, (url, digest_hex, mimetype, len(data), time.time()), commit=True)
 
-        next_page = data.get("nextPageToken")
-        if not next_page:
-            break
+    evict_thumbnails()
+    return {"digest": digest_hex, "mimetype": mimetype}
 
-    return videos
 
-# -----------------------
-# DB management
-# -----------------------
-def manage_playlist(playlist, videos, update=False):
+def evict_thumbnails():
     """
-    Insert or update playlist + videos.
+    Keep the thumbnail cache under THUMB_CACHE_BYTES by dropping
+    least recently used entries (down to 90% of the budget).
     """
-    if not playlist:
-        return False
+    total = run_query("SELECT COALESCE(SUM(size), 0) FROM thumb_cache;")[0][0]
+    if total <= THUMB_CACHE_BYTES:
+        return
 
-    if update:
-        query = """
-            UPDATE playlist SET
-                title = ?, thumbnail = ?, video_count = ?, hash = ?
-            WHERE playlist_id = ?;
-        """
-        params = (
-            playlist["title"], playlist["thumbnail"],
-            playlist["video_count"], playlist["hash"],
-            playlist["playlist_id"]
-        )
-        run_query(query, params, commit=True)
-        manage_videos(videos, playlist["playlist_id"])
-        return True
-
-    # Insert
-    query = """
-        INSERT INTO playlist (playlist_id, title, channel, thumbnail, video_count, hash)
-        VALUES (?, ?, ?, ?, ?, ?);
-    """
-    params = (
-        playlist["playlist_id"], playlist["title"], playlist["channel"],
-        playlist["thumbnail"], playlist["video_count"], playlist["hash"]
-    )
-    run_query(query, params, commit=True)
+    to_free = total - THUMB_CACHE_BYTES * 0.9
+    dropped = set()
+
+    with transaction() as conn:
+        victims = []
+        for row in conn.execute("SELECT url, digest, size FROM thumb_cache ORDER BY accessed ASC;"):
+            victims.append((row["url"],))
+            dropped.add(row["digest"])
+            to_free -= row["size"]
+            if to_free <= 0:
+                break
+
+        conn.executemany("DELETE FROM thumb_cache WHERE url=?;", victims)
+        still_used = {
+            r["digest"] for r in conn.execute(
+                f"SELECT digest FROM thumb_cache WHERE digest IN ({','.join('?' * len(dropped))});",
+                list(dropped)
+            )
+        }
 
-    v_query = """
-        INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash)
-        VALUES (?, ?, ?, ?, ?, ?, ?);
-    """
-    for v in videos:
-        v_params = (
-            v["vid_id"], v["playlist_id"], v["title"], v["channel"],
-            v["thumbnail"], v["idx_in_playlist"], v["hash"]
-        )
-        run_query(v_query, v_params, commit=True)
+    for digest_hex in dropped - still_used:
+        try:
+            os.remove(thumb_path(digest_hex))
+        except FileNotFoundError:
+            pass
 
-    return True
 
+def prefetch_thumbnails(urls):
+    """Download thumbnails into the cache in the background."""
+    if not THUMB_PREFETCH:
+        return
+    for url in dict.fromkeys(u for u in urls if u):
+        _thumb_pool.submit(cache_thumbnail, url)
 
-def manage_videos(videos, playlist_id):
-    fetched_data = {v["vid_id"]: v for v in videos}
-    fetched_ids = set(fetched_data.keys())
 
-    rows = run_query(
-        "SELECT vid_id, hash FROM video WHERE playlist_id = ?;",
-        (playlist_id,)
-    )
-    if rows is None:
-        return
+@app.template_global()
+def thumb_url(kind, item_id, src):
+    """
+    Proxied thumbnail URL for a video or playlist.
+    The ?v= part changes with the source URL, so it can be cached for long.
+    """
+    if not src:
+        return ""
+    return url_for("thumbnail", kind=kind, item_id=item_id, v=format(zlib.crc32(src.encode()), "x"))
 
-    stored_ids = {r["vid_id"] for r in rows}
-    stored_hash = {r["vid_id"]: r["hash"] for r in rows}
-
-    # Insert
-    insert_ids = fetched_ids - stored_ids
-    insert_query = """
-        INSERT INTO video (
-            vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash
-        ) VALUES (?, ?, ?, ?, ?, ?, ?);
-    """
-    for vid in insert_ids:
-        v = fetched_data[vid]
-        params = (
-            v["vid_id"], v["playlist_id"], v["title"], v["channel"],
-            v["thumbnail"], v["idx_in_playlist"], v["hash"]
-        )
-        run_query(insert_query, params, commit=True)
-
-    # Update
-    update_ids = fetched_ids & stored_ids
-    update_query = """
-        UPDATE video SET
-            title = ?, thumbnail = ?, idx_in_playlist = ?, hash = ?
-        WHERE vid_id = ?;
-    """
-    for vid in update_ids:
-        v = fetched_data[vid]
-        if stored_hash.get(vid) != v["hash"]:
-            params = (
-                v["title"], v["thumbnail"],
-                v["idx_in_playlist"], v["hash"], vid
-            )
-            run_query(update_query, params, commit=True)
 
-    # Delete
-    delete_ids = stored_ids - fetched_ids
-    del_query = "DELETE FROM video WHERE vid_id = ?;"
-    for vid in delete_ids:
-        run_query(del_query, (vid,), commit=True)
+# ===============================
+# Flask Routes
+# ===============================
 
-# -----------------------
-# Routes
-# -----------------------
 @app.route("/")
 def index():
-    rows = run_query("SELECT * FROM playlist;")
-    return render_template("index.html", playlists=rows or [])
+    """Show all saved playlists (cached until a playlist is written)."""
+    count, last_refresh = run_query("SELECT COUNT(*), MAX(refreshed_at) FROM playlist;")[0]
+
+    def render():
+        rows = run_query("SELECT * FROM playlist;")
+        return render_template("index.html", playlists=rows)
+
+    return cached_page("index", ("index", count, last_refresh), last_refresh, render)
 
 
 @app.route("/add_playlist", methods=["POST"])
 def add_playlist():
+    """
+    Add a new playlist or refresh an existing one.
+    Automatically extracts ID from URL.
+    """
     URL = request.form.get("url")
     playlist_id = extract_playlist_id(URL)
 
-    playlist_data = fetch_playlist_details(playlist_id)
-    videos_data = fetch_playlist_items(playlist_id)
+    sync_playlist(playlist_id)
+    return redirect("/")
 
-    existing = run_query(
-        "SELECT playlist_id FROM playlist WHERE playlist_id = ?;",
-        (playlist_id,)
-    )
-    to_update = bool(existing)
 
-    manage_playlist(playlist_data, videos_data, update=to_update)
-    return redirect("/")
+def video_page(playlist_id, after=-1, limit=VIDEO_PAGE_SIZE):
+    """
+    One page of a playlist's videos in playlist order (keyset pagination
+    on the video_playlist_idx index, so cost doesn't grow with page number).
+    Returns (videos, next_after): next_after is the cursor of the
+    following page, or None on the last page.
+    """
+    rows = run_query("""
+        SELECT vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist
+        FROM video
+        WHERE playlist_id=? AND idx_in_playlist > ?
+        ORDER BY idx_in_playlist ASC
+        LIMIT ?;
+    """, (playlist_id, after, limit + 1))
+
+    next_after = rows[limit - 1]["idx_in_playlist"] if len(rows) > limit else None
+    return rows[:limit], next_after
 
 
 @app.route("/playlist/<playlist_id>")
 def show_playlist(playlist_id):
-    rows = run_query(
-        "SELECT * FROM video WHERE playlist_id = ? ORDER BY idx_in_playlist ASC;",
-        (playlist_id,)
-    )
-    return render_template("playlist.html", videos=rows or [], playlist_id=playlist_id)
+    """
+    Show playlist contents (first page of videos).
+    - ?after=n → start after position n (no-JS "Load more")
+    """
+    after = request.args.get("after", -1, type=int)
+
+    stored = run_query("SELECT hash, refreshed_at FROM playlist WHERE playlist_id=?", (playlist_id,))
+    playlist_hash, refreshed_at = stored[0] if stored else (None, None)
+
+    def render():
+        rows, next_after = video_page(playlist_id, after)
+        return render_template("playlist.html", videos=rows, playlist_id=playlist_id, next_after=next_after)
+
+    key = (playlist_id, playlist_hash, refreshed_at, after)
+    return cached_page(playlist_id, key, refreshed_at, render)
+
+
+@app.route("/playlist/<playlist_id>/videos")
+def playlist_videos(playlist_id):
+    """
+    Videos API for infinite scroll (JSON).
+    - ?after=n → cursor from the previous page
+    - ?limit=n → page size (max VIDEO_PAGE_MAX)
+    """
+    after = request.args.get("after", -1, type=int)
+    limit = min(max(request.args.get("limit", VIDEO_PAGE_SIZE, type=int), 1), VIDEO_PAGE_MAX)
+    rows, next_after = video_page(playlist_id, after, limit)
+
+    return {
+        "videos": [
+            {
+                "vid_id": r["vid_id"],
+                "playlist_id": r["playlist_id"],
+                "title": r["title"],
+                "channel": r["channel"],
+                "thumbnail": thumb_url("video", r["vid_id"], r["thumbnail"]),
+            }
+            for r in rows
+        ],
+        "next_after": next_after,
+    }
 
 
 @app.route("/playlist/<playlist_id>/refresh")
 def refresh_playlist(playlist_id):
-    playlist_data = fetch_playlist_details(playlist_id)
-    videos_data = fetch_playlist_items(playlist_id)
+    """
+    Queue a background refresh and return immediately.
+    - ?full=true → ignore stored ETags and hash, crawl every page
+    - ?format=json → return the job (202) instead of redirecting
+    """
+    full = request.args.get("full", "false").lower() == "true"
+    job = refresh_queue.enqueue(playlist_id, full=full)
 
-    manage_playlist(playlist_data, videos_data, update=True)
-    print("refresh")
+    if request.args.get("format") == "json":
+        return job, 202
     return redirect(url_for("show_playlist", playlist_id=playlist_id))
 
 
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Status of a refresh job (JSON); includes the refresh report once done."""
+    job = refresh_queue.get(job_id)
+    if not job:
+        abort(404)
+    return job
+
+
 @app.route("/delete/<playlist_id>")
 def delete_playlist(playlist_id):
-    run_query("DELETE FROM playlist WHERE playlist_id = ?;", (playlist_id,), commit=True)
+    """Delete playlist + its videos (cascade)."""
+    run_query("DELETE FROM playlist WHERE playlist_id=?", (playlist_id,), commit=True)
+    page_cache.invalidate(playlist_id, "index")
     return redirect("/")
 
 
+def fts_query(text):
+    """
+    Turn user input into a safe FTS5 query:
+    every word must match, the last one as a prefix.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(text, page=1, per_page=SEARCH_PAGE_SIZE):
+    """
+    Ranked full-text search (bm25, title weighted over channel).
+    Returns (playlists, videos, has_more); playlists only on page 1.
+    """
+    match = fts_query(text)
+    if not match:
+        return [], [], False
+
+    playlists = []
+    if page == 1:
+        playlists = run_query("""
+            SELECT p.playlist_id, p.title, p.channel, p.thumbnail, p.video_count
+            FROM playlist_fts JOIN playlist p ON p.id = playlist_fts.rowid
+            WHERE playlist_fts MATCH ?
+            ORDER BY bm25(playlist_fts, 10.0, 1.0)
+            LIMIT 10;
+        """, (match,))
+
+    videos = run_query("""
+        SELECT v.vid_id, v.playlist_id, v.title, v.channel, v.thumbnail
+        FROM video_fts JOIN video v ON v.id = video_fts.rowid
+        WHERE video_fts MATCH ?
+        ORDER BY bm25(video_fts, 10.0, 1.0)
+        LIMIT ? OFFSET ?;
+    """, (match, per_page + 1, (page - 1) * per_page))
+
+    return playlists, videos[:per_page], len(videos) > per_page
+
+
+@app.route("/search")
+def search_page():
+    """
+    Search saved playlists and videos.
+    - ?q=text → search terms
+    - ?page=n → results page
+    - ?format=json → JSON instead of HTML
+    """
+    text = request.args.get("q", "").strip()
+    page = min(max(request.args.get("page", 1, type=int), 1), SEARCH_MAX_PAGE)
+    playlists, videos, has_more = search(text, page)
+
+    if request.args.get("format") == "json":
+        return {
+            "query": text,
+            "page": page,
+            "playlists": [dict(r) for r in playlists],
+            "videos": [dict(r) for r in videos],
+            "has_more": has_more,
+        }
+
+    return render_template(
+        "search.html", query=text, page=page,
+        playlists=playlists, videos=videos,
+        has_more=has_more and page < SEARCH_MAX_PAGE
+    )
+
+
+@app.route("/thumb/<kind>/<item_id>")
+def thumbnail(kind, item_id):
+    """
+    Serve a video/playlist thumbnail from the disk cache.
+    Falls back to redirecting to YouTube if it can't be downloaded.
+    """
+    if kind == "video":
+        rows = run_query("SELECT thumbnail FROM video WHERE vid_id=?", (item_id,))
+    elif kind == "playlist":
+        rows = run_query("SELECT thumbnail FROM playlist WHERE playlist_id=?", (item_id,))
+    else:
+        abort(404)
+
+    if not rows or not rows[0]["thumbnail"]:
+        abort(404)
+
+    src = rows[0]["thumbnail"]
+    entry = cache_thumbnail(src)
+    if not entry:
+        return redirect(src)
+
+    # Opened before sending: eviction may remove the file at any time,
+    # but an open file stays readable
+    try:
+        f = open(thumb_path(entry["digest"]), "rb")
+    except FileNotFoundError:
+        return redirect(src)
+
+    # send_file hands the file to the server's sendfile (wsgi.file_wrapper)
+    return send_file(
+        f,
+        mimetype=entry["mimetype"],
+        max_age=THUMB_MAX_AGE,
+        etag=entry["digest"],
+        conditional=True
+    )
+
+
+@app.route("/stats/db")
+def db_stats():
+    """Connection pool usage (JSON), for sizing DB_POOL_SIZE."""
+    return db_pool.status()
+
+
+@app.route("/stats/api")
+def api_stats():
+    """YouTube API client health (JSON): circuit breaker, retries, quota units per day and playlist."""
+    return {"breaker": api_breaker.status(), "quota": api_quota.status()}
+
+
+@app.route("/stats/cache")
+def cache_stats():
+    """Page cache usage (JSON), for sizing PAGE_CACHE_BYTES."""
+    return page_cache.status()
+
+
 @app.route("/video/<video_id>")
 def show_video(video_id):
+    """Show a single video page."""
     playlist_id = request.args.get("playlist_id")
     return render_template("video.html", vid_id=video_id, playlist_id=playlist_id)
 
 
-@app.route("/back", methods=["GET"])
+@app.route("/back")
 def go_back():
-    go_home = request.args.get("home", "false").lower() == "true"
-    if go_home:
+    """
+    Universal back button logic:
+    - ?home=true → go to homepage
+    - ?playlist=x → go back to playlist x
+    """
+    if request.args.get("home", "false").lower() == "true":
         return redirect("/")
     playlist_id = request.args.get("playlist")
     return redirect(f"/playlist/{playlist_id}" if playlist_id else "/")
 
 
-# -----------------------
+# ===============================
 # Error Handlers
-# -----------------------
+# ===============================
+
 @app.errorhandler(HTTPException)
 def handle_http_exception(e):
-    data = {
+    """Handle 404, 403, etc."""
+    return render_template("error.html", data={
         "error": e.name,
         "code": e.code,
         "description": e.description
-    }
-    return render_template("error.html", data=data), e.code
+    }), e.code
 
 
 @app.errorhandler(Exception)
 def handle_generic_exception(e):
-    data = {
+    """Handle unexpected errors."""
+    return render_template("error.html", data={
         "error": "Internal Server Error",
         "code": 500,
         "description": str(e) if current_app.debug else "Something went wrong."
-    }
-    return render_template("error.html", data=data), 500
+    }), 500
+
 
+# ===============================
+# Run Server
+# ===============================
 
-# -----------------------
-# Run server
-# -----------------------
 if __name__ == "__main__":
+    # Only the reloader's serving process runs the scheduler
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_scheduler()
     app.run(debug=True)
@@ -0,0 +1,109 @@
+"""
+Benchmark video change detection on large diffs.
+
+Compares, for a playlist of --videos stored videos (default 100,000)
+refreshed with 10% changed, 5% removed and 5% added:
+- hashing:  MD5 hex of concatenated fields vs 8-byte BLAKE2b digest()
+- diff:     Python dicts/sets over SELECT vid_id, hash (previous
+            manage_videos) vs the SQL temp-table diff in manage_videos()
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_diff.py [--videos 100000]
+"""
+import sys
+import time
+import hashlib
+import argparse
+
+from common import load_app
+
+
+def md5_video(video):
+    """Previous hash_video()."""
+    text = video["title"] + video["thumbnail"] + str(video["idx_in_playlist"])
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def make_videos(playlist_id, size, hash_fn, edit=False):
+    videos = []
+    for pos in range(size):
+        if edit and pos % 20 == 0:
+            continue  # 5% removed
+        title = f"Video {pos} (edited)" if edit and pos % 10 == 1 else f"Video {pos}"
+        video = {
+            "vid_id": f"{playlist_id}-v{pos}", "playlist_id": playlist_id, "title": title,
+            "channel": "Bench", "thumbnail": f"https://i.ytimg.com/vi/{pos}/mq.jpg", "idx_in_playlist": pos,
+        }
+        video["hash"] = hash_fn(video)
+        videos.append(video)
+
+    if edit:
+        videos += make_videos(f"{playlist_id}-new", size // 20, hash_fn)  # 5% added
+        for v in videos[-(size // 20):]:
+            v["playlist_id"] = playlist_id
+    return videos
+
+
+def legacy_diff(conn, videos, playlist_id):
+    """Previous manage_videos(): Python dicts and sets + executemany."""
+    fetched_data = {v["vid_id"]: v for v in videos}
+    fetched_ids = set(fetched_data)
+    rows = conn.execute("SELECT vid_id, hash FROM video WHERE playlist_id=?", (playlist_id,)).fetchall()
+    stored_ids = {r["vid_id"] for r in rows}
+    stored_hash = {r["vid_id"]: r["hash"] for r in rows}
+
+    insert = [fetched_data[v] for v in fetched_ids - stored_ids]
+    update = [fetched_data[v] for v in fetched_ids & stored_ids if stored_hash[v] != fetched_data[v]["hash"]]
+    delete = [(v,) for v in stored_ids - fetched_ids]
+
+    conn.executemany("""
+        INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash)
+        VALUES (:vid_id, :playlist_id, :title, :channel, :thumbnail, :idx_in_playlist, :hash);
+    """, insert)
+    conn.executemany("UPDATE video SET title=:title, thumbnail=:thumbnail, idx_in_playlist=:idx_in_playlist, "
+                     "hash=:hash WHERE vid_id=:vid_id;", update)
+    conn.executemany("DELETE FROM video WHERE vid_id=?;", delete)
+    return len(insert) + len(update), len(delete)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--videos", type=int, default=100_000)
+    args = parser.parse_args()
+    size = args.videos
+
+    app = load_app()
+
+    print(f"{size:,} stored videos, refresh with 10% changed / 5% removed / 5% added\n")
+    print(f"{'engine':>7} {'hash (s)':>9} {'diff (s)':>9} {'upserted':>9} {'deleted':>8} {'hash size':>10}")
+
+    engines = [
+        ("legacy", md5_video, legacy_diff),
+        ("new", app.hash_video, lambda conn, videos, pid: app.manage_videos(videos, pid, conn)),
+    ]
+
+    for name, hash_fn, diff in engines:
+        playlist_id = f"PL-{name}"
+        app.run_query("INSERT INTO playlist (playlist_id, title) VALUES (?, ?);", (playlist_id, name), commit=True)
+
+        with app.transaction() as conn:
+            diff(conn, make_videos(playlist_id, size, hash_fn), playlist_id)
+
+        # Hashing cost of a full refresh
+        start = time.perf_counter()
+        fetched = make_videos(playlist_id, size, hash_fn, edit=True)
+        hash_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with app.transaction() as conn:
+            upserted, deleted = diff(conn, fetched, playlist_id)
+        diff_time = time.perf_counter() - start
+
+        hash_size = len(fetched[0]["hash"])
+        print(f"{name:>7} {hash_time:>9.3f} {diff_time:>9.3f} {upserted:>9} {deleted:>8} {hash_size:>8} B")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark playlist fetching against a local YouTube API stub.
+
+Compares:
+- legacy:     one urlopen() per page, no keep-alive (previous behaviour)
+- sequential: FETCH_MODE="sequential" (keep-alive, no overlap)
+- pipelined:  FETCH_MODE="pipelined"  (keep-alive, next page prefetched,
+              details fetched alongside the first items page)
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_fetch.py [--latency 0.02]
+"""
+import sys
+import json
+import time
+import argparse
+import urllib.parse
+import urllib.request
+
+from common import StubYouTube, load_app
+
+SIZES = [500, 2000, 5000]
+
+
+def legacy_fetch(app, playlist_id):
+    """Old fetch path: details first, then one blocking urlopen per page."""
+    def get(endpoint, params):
+        url = f"{app.API_BASE}/{endpoint}?{urllib.parse.urlencode(params)}"
+        with urllib.request.urlopen(url) as resp:
+            return json.loads(resp.read().decode())
+
+    get("playlists", {"part": "snippet,contentDetails", "id": playlist_id, "key": app.API_KEY})
+
+    videos = []
+    next_page = None
+    while True:
+        params = {"part": "snippet,contentDetails", "playlistId": playlist_id,
+                  "maxResults": 50, "key": app.API_KEY}
+        if next_page:
+            params["pageToken"] = next_page
+        data = get("playlistItems", params)
+        for item in data.get("items", []):
+            video = app.parse_playlist_item(item, playlist_id)
+            if video:
+                videos.append(video)
+        next_page = data.get("nextPageToken")
+        if not next_page:
+            return videos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.02, help="stub RTT in seconds")
+    args = parser.parse_args()
+
+    app = load_app()
+    stub = StubYouTube({f"PL{n}": n for n in SIZES}, latency=args.latency).start()
+    app.API_BASE = stub.base_url
+
+    def run_mode(mode, playlist_id):
+        if mode == "legacy":
+            return legacy_fetch(app, playlist_id)
+        app.FETCH_MODE = mode
+        return app.fetch_playlist(playlist_id)[1]
+
+    print(f"stub latency: {args.latency * 1000:.0f} ms per request\n")
+    print(f"{'videos':>7} {'mode':>11} {'wall (s)':>9} {'requests':>9} {'conns':>6}")
+
+    for size in SIZES:
+        for mode in ("legacy", "sequential", "pipelined"):
+            stub.requests = stub.connections = 0
+            start = time.perf_counter()
+            videos = run_mode(mode, f"PL{size}")
+            elapsed = time.perf_counter() - start
+
+            assert len(videos) == size, (mode, len(videos))
+            print(f"{size:>7} {mode:>11} {elapsed:>9.3f} {stub.requests:>9} {stub.connections:>6}")
+        print()
+
+    stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
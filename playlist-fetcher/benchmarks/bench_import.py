@@ -0,0 +1,46 @@
+"""
+Bulk import throughput per --workers count.
+
+Imports --playlists playlists of --videos videos each through
+import_playlists() against the local YouTube API stub, for several
+worker counts, in both fetch modes. Every run imports its own playlist ids, so
+nothing is skipped as already stored.
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_import.py [--playlists 16] [--videos 200]
+"""
+import argparse
+
+from common import StubYouTube, load_app
+
+WORKERS = [1, 4, 8, 16]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--playlists", type=int, default=16)
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub RTT in seconds")
+    args = parser.parse_args()
+
+    app = load_app()
+    runs = [(mode, workers) for mode in ("sequential", "pipelined") for workers in WORKERS]
+    ids = {run: [f"PL{run[0]}{run[1]}-{n}" for n in range(args.playlists)] for run in runs}
+    stub = StubYouTube({p: args.videos for run in runs for p in ids[run]}, latency=args.latency).start()
+    app.API_BASE = stub.base_url
+
+    print(f"{args.playlists} playlists × {args.videos} videos, {args.latency * 1000:.0f} ms RTT\n")
+    print(f"{'mode':>10} {'workers':>8} {'seconds':>8} {'playlists/min':>14} {'videos/s':>9}")
+
+    for mode, workers in runs:
+        app.FETCH_MODE = mode
+        stats = app.import_playlists(ids[mode, workers], workers=workers, log=lambda msg: None)
+        assert stats["done"] == args.playlists, stats
+        print(f"{mode:>10} {workers:>8} {stats['seconds']:>8.2f} "
+              f"{stats['playlists_per_min']:>14.0f} {stats['videos_per_sec']:>9.0f}")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
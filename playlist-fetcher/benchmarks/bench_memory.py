@@ -0,0 +1,57 @@
+"""
+Benchmark peak Python memory of a playlist sync (tracemalloc).
+
+Syncs new playlists of growing size (--sizes, default 1k/10k/50k videos)
+from the local stub, with:
+- batch:      whole playlist collected in memory, then manage_playlist()
+- streaming:  every page written to the staging tables as it arrives,
+              reconciled in SQL at the end (apply_staged)
+
+Peak memory should grow with playlist size in batch mode only.
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_memory.py [--sizes 1000 10000 50000]
+"""
+import sys
+import time
+import argparse
+import tracemalloc
+
+from common import load_app, StubYouTube
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 50_000])
+    args = parser.parse_args()
+
+    app = load_app()
+    stub = StubYouTube({}, latency=0).start()
+    app.API_BASE = stub.base_url
+
+    print(f"{'videos':>7} {'mode':>10} {'time (s)':>9} {'peak (KiB)':>11} {'KiB/1k videos':>14}")
+
+    tracemalloc.start()
+    for size in args.sizes:
+        for mode in ("batch", "streaming"):
+            playlist_id = f"PL-{mode}-{size}"
+            stub.playlists[playlist_id] = size
+            app.SYNC_MODE = mode
+
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            report = app.sync_playlist(playlist_id)
+            elapsed = time.perf_counter() - start
+            peak = (tracemalloc.get_traced_memory()[1] - base) / 1024
+
+            assert report["videos_fetched"] == size
+            print(f"{size:>7} {mode:>10} {elapsed:>9.2f} {peak:>11,.0f} {peak * 1000 / size:>14,.1f}")
+
+    tracemalloc.stop()
+    stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Benchmark conditional (ETag) playlist refresh against a local YouTube API stub.
+
+For each playlist size, refreshes after:
+- nothing changed            → playlist 304, item crawl skipped
+- one video retitled         → playlist hash unchanged, item crawl skipped
+                               (picked up by the scheduled full refresh,
+                               see FULL_REFRESH_INTERVAL)
+- playlist renamed           → item crawl runs, every page 304
+- renamed + video retitled   → only the edited page re-fetched
+- 10 videos appended         → every page re-fetched (pageInfo.totalResults
+                               is part of each page, so all ETags change)
+- forced full refresh        → every page fetched
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_refresh.py [--latency 0.02]
+"""
+import sys
+import time
+import argparse
+
+from common import StubYouTube, load_app
+
+SIZES = [500, 2000, 5000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.02, help="stub RTT in seconds")
+    args = parser.parse_args()
+
+    app = load_app()
+    stub = StubYouTube({f"PL{n}": n for n in SIZES}, latency=args.latency).start()
+    app.API_BASE = stub.base_url
+
+    print(f"{'videos':>7} {'scenario':>17} {'wall (s)':>9} {'requests':>9} {'304s':>5} "
+          f"{'fetched':>8} {'skipped':>8} {'crawl':>6}")
+
+    for size in SIZES:
+        playlist_id = f"PL{size}"
+        app.sync_playlist(playlist_id)
+
+        def edit_one():
+            stub.edits[(playlist_id, size - 1)] = "Retitled"
+
+        def rename(title):
+            return lambda: stub.titles.__setitem__(playlist_id, title)
+
+        def rename_and_edit():
+            stub.titles[playlist_id] = "Renamed twice"
+            stub.edits[(playlist_id, size // 2)] = "Retitled"
+
+        def append():
+            stub.playlists[playlist_id] += 10
+
+        scenarios = [
+            ("unchanged", None, False),
+            ("video retitled", edit_one, False),
+            ("playlist renamed", rename("Renamed"), False),
+            ("renamed + edit", rename_and_edit, False),
+            ("10 appended", append, False),
+            ("forced full", None, True),
+        ]
+
+        for name, change, full in scenarios:
+            if change:
+                change()
+            stub.requests = stub.not_modified = 0
+
+            start = time.perf_counter()
+            report = app.sync_playlist(playlist_id, full=full)
+            elapsed = time.perf_counter() - start
+
+            crawl = "skip" if report["crawl_skipped"] else "yes"
+            print(f"{size:>7} {name:>17} {elapsed:>9.3f} {stub.requests:>9} {stub.not_modified:>5} "
+                  f"{report['pages_fetched']:>8} {report['pages_skipped']:>8} {crawl:>6}")
+
+        stored = app.run_query("SELECT COUNT(*) FROM video WHERE playlist_id=?", (playlist_id,))[0][0]
+        assert stored == stub.playlists[playlist_id], (stored, stub.playlists[playlist_id])
+        print()
+
+    stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Benchmark the YouTube API client under injected faults.
+
+Imports --playlists playlists (default 20 × 500 videos) with 4 workers
+through sync_playlist(), against the local stub with:
+- clean:   no faults
+- errors:  10% of calls answered 500 / 503 / 429
+- slow:    5% of calls stall for 2 s (client timeout 0.5 s)
+- outage:  every call fails with 503
+
+for two client setups:
+- bare:    no retries, no circuit breaker (previous behaviour, but with timeouts)
+- retry:   backoff with jitter + circuit breaker
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_retry.py [--playlists 20] [--videos 500]
+"""
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from common import load_app, StubYouTube
+
+SCENARIOS = {
+    "clean": {},
+    "errors": {"error_rate": 0.10},
+    "slow": {"slow_rate": 0.05},
+    "outage": {"outage": True},
+}
+
+
+def setup_client(app, retry):
+    app.API_TIMEOUT = 0.5
+    app.API_BACKOFF = 0.05
+    app.API_BACKOFF_MAX = 1
+    app.API_RETRIES = 4 if retry else 0
+    app.api_breaker = app.CircuitBreaker(5 if retry else 0, 2)
+    app.api_quota = app.QuotaTracker(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--playlists", type=int, default=20)
+    parser.add_argument("--videos", type=int, default=500)
+    args = parser.parse_args()
+
+    app = load_app()
+
+    print(f"{args.playlists} playlists × {args.videos} videos, 4 workers\n")
+    print(f"{'scenario':>8} {'client':>6} {'time (s)':>9} {'ok':>4} {'failed':>7} "
+          f"{'calls':>6} {'retries':>8} {'timeouts':>9} {'trips':>6} {'units/pl':>9}")
+
+    for scenario, faults in SCENARIOS.items():
+        for client in ("bare", "retry"):
+            ids = [f"PL-{scenario}-{client}-{n}" for n in range(args.playlists)]
+            stub = StubYouTube({pid: args.videos for pid in ids}, latency=0.005)
+            for name, value in faults.items():
+                setattr(stub, name, value)
+            stub.start()
+            app.API_BASE = stub.base_url
+            setup_client(app, client == "retry")
+
+            def sync(playlist_id):
+                try:
+                    return app.sync_playlist(playlist_id)
+                except Exception:
+                    return None
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                reports = list(pool.map(sync, ids))
+            elapsed = time.perf_counter() - start
+            stub.stop()
+
+            ok = [r for r in reports if r]
+            quota = app.api_quota.status()
+            units = sum(r["quota_units"] for r in ok) / len(ok) if ok else 0
+            print(f"{scenario:>8} {client:>6} {elapsed:>9.2f} {len(ok):>4} {len(reports) - len(ok):>7} "
+                  f"{stub.requests:>6} {quota['retries']:>8} {quota['timeouts']:>9} "
+                  f"{app.api_breaker.status()['trips']:>6} {units:>9.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
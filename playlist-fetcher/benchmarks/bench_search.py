@@ -0,0 +1,90 @@
+"""
+Benchmark full-text search on a synthetic database.
+
+Builds a database of --videos videos (default 1,000,000) spread over
+playlists of 500, with titles drawn from a Zipf-like vocabulary, then
+times search() for rare, common, multi-word and prefix queries.
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_search.py [--videos 1000000]
+"""
+import sys
+import time
+import random
+import itertools
+import argparse
+import statistics
+
+from common import load_app
+
+VOCAB_SIZE = 20000
+WORDS_PER_TITLE = 6
+PLAYLIST_SIZE = 500
+REPEAT = 20
+
+
+def build(app, total):
+    """Fill the database through the same sync + FTS triggers the app uses."""
+    rng = random.Random(42)
+    vocab = [f"w{n}" for n in range(VOCAB_SIZE)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCAB_SIZE)))
+
+    with app.transaction() as conn:
+        for start in range(0, total, PLAYLIST_SIZE):
+            playlist_id = f"PL{start // PLAYLIST_SIZE}"
+            conn.execute(
+                "INSERT INTO playlist (playlist_id, title, channel, thumbnail, video_count, hash) VALUES (?, ?, ?, '', ?, '');",
+                (playlist_id, " ".join(rng.choices(vocab, cum_weights=cum_weights, k=3)), f"channel{start % 97}", PLAYLIST_SIZE)
+            )
+            titles = (" ".join(rng.choices(vocab, cum_weights=cum_weights, k=WORDS_PER_TITLE)) for _ in range(PLAYLIST_SIZE))
+            app.manage_videos([
+                {
+                    "vid_id": f"{playlist_id}-v{pos}", "playlist_id": playlist_id, "title": title,
+                    "channel": f"channel{pos % 97}", "thumbnail": "", "idx_in_playlist": pos, "hash": b"",
+                }
+                for pos, title in enumerate(titles)
+            ], playlist_id, conn)
+
+
+def timed(app, text, page):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        _, videos, _ = app.search(text, page)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return len(videos), statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--videos", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    app = load_app()
+
+    start = time.perf_counter()
+    build(app, args.videos)
+    print(f"built {args.videos:,} videos in {time.perf_counter() - start:.1f}s\n")
+
+    queries = [
+        ("rare word", "w19000"),
+        ("mid word", "w500"),
+        ("common word", "w3"),
+        ("two words", "w3 w40"),
+        ("prefix", "w1234"),
+        ("channel", "channel42 w10"),
+    ]
+
+    print(f"{'query':>12} {'text':>14} {'matches':>9} {'page':>5} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for name, text in queries:
+        matches = app.run_query("SELECT COUNT(*) FROM video_fts WHERE video_fts MATCH ?;",
+                                (app.fts_query(text),))[0][0]
+        for page in (1, 10):
+            _, p50, p95 = timed(app, text, page)
+            print(f"{name:>12} {text:>14} {matches:>9} {page:>5} {p50 * 1000:>9.2f} {p95 * 1000:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
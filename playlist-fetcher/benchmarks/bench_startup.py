@@ -0,0 +1,146 @@
+"""
+Benchmark worker startup: importing app.py and serving the first request.
+
+Each run is a fresh Python process (like a new gunicorn worker) against:
+- fresh:    no database yet (all migrations run)
+- legacy:   database from the old duplicated init_db() (user_version 0,
+            extra play_id_idx / vid_id_and_hash_idx indexes)
+- always:   up-to-date database, but DDL forced on every start
+            (previous behaviour: init_db() ran all CREATE ... IF NOT EXISTS)
+- current:  up-to-date database (a single PRAGMA user_version read)
+
+Also measures video write speed with and without the duplicate indexes.
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_startup.py [--runs 10] [--videos 5000]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from common import APP_DIR
+
+# Child process: time `import app` and the first GET /
+CHILD = """
+import sys, time, json
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+resp = app.app.test_client().get("/")
+served = time.perf_counter()
+print(json.dumps({"import": imported - start, "first": served - imported, "status": resp.status_code}))
+"""
+
+LEGACY_SCHEMA = """
+CREATE TABLE playlist (playlist_id TEXT PRIMARY KEY, title TEXT, channel TEXT, thumbnail TEXT,
+                       video_count INTEGER, hash TEXT);
+CREATE TABLE video (vid_id TEXT PRIMARY KEY, playlist_id TEXT NOT NULL, title TEXT, channel TEXT,
+                    thumbnail TEXT, idx_in_playlist INTEGER, hash TEXT,
+                    FOREIGN KEY (playlist_id) REFERENCES playlist(playlist_id) ON DELETE CASCADE);
+CREATE INDEX video_playlist_idx ON video(playlist_id, idx_in_playlist);
+CREATE INDEX play_id_idx ON playlist(playlist_id, hash);
+CREATE INDEX vid_id_and_hash_idx ON video(vid_id, hash);
+"""
+
+
+def make_legacy(path, videos):
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO playlist VALUES ('PL1', 'Bench', 'Bench', '', ?, 'h');", (videos,))
+    conn.executemany(
+        "INSERT INTO video VALUES (?, 'PL1', ?, 'Bench', '', ?, 'h');",
+        ((f"v{i}", f"Video {i}", i) for i in range(videos))
+    )
+    conn.commit()
+    conn.close()
+
+
+def start_worker(workdir):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, APP_DIR], cwd=workdir, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def set_version(path, version):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {version};")
+    conn.close()
+
+
+def time_upserts(path, videos):
+    """Re-hash and re-insert every video row once; returns rows/second."""
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    with conn:
+        conn.executemany("UPDATE video SET hash=? WHERE vid_id=?;", ((f"h{i}", f"v{i}") for i in range(videos)))
+        conn.execute("DELETE FROM video;")
+        conn.executemany(
+            "INSERT INTO video VALUES (?, 'PL1', ?, 'Bench', '', ?, 'h');",
+            ((f"v{i}", f"Video {i}", i) for i in range(videos))
+        )
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return videos * 3 / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--videos", type=int, default=5000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="pf-startup-")
+    template = os.path.join(root, "legacy.db")
+    make_legacy(template, args.videos)
+
+    print(f"{args.runs} worker starts per scenario, {args.videos:,} stored videos\n")
+    print(f"{'scenario':>9} {'import (ms)':>12} {'first GET (ms)':>15} {'total (ms)':>11}")
+
+    for scenario in ("fresh", "legacy", "always", "current"):
+        imports, firsts = [], []
+        for run in range(args.runs):
+            workdir = os.path.join(root, f"{scenario}-{run}")
+            os.makedirs(workdir)
+            db = os.path.join(workdir, "youtube.db")
+
+            if scenario != "fresh":
+                shutil.copy(template, db)
+            if scenario in ("always", "current"):
+                start_worker(workdir)   # migrate once up front
+            if scenario == "always":
+                set_version(db, 0)
+
+            result = start_worker(workdir)
+            imports.append(result["import"] * 1000)
+            firsts.append(result["first"] * 1000)
+
+        imp, first = statistics.median(imports), statistics.median(firsts)
+        print(f"{scenario:>9} {imp:>12.1f} {first:>15.1f} {imp + first:>11.1f}")
+
+    # Write cost of the duplicate indexes (same tables, no FTS triggers)
+    print(f"\n{'indexes':>9} {'video writes/s':>15}")
+    legacy_copy = os.path.join(root, "writes-legacy.db")
+    merged_copy = os.path.join(root, "writes-merged.db")
+    shutil.copy(template, legacy_copy)
+    shutil.copy(template, merged_copy)
+    conn = sqlite3.connect(merged_copy)
+    conn.executescript("DROP INDEX play_id_idx; DROP INDEX vid_id_and_hash_idx;")
+    conn.close()
+    for name, path in (("legacy", legacy_copy), ("merged", merged_copy)):
+        print(f"{name:>9} {time_upserts(path, args.videos):>15,.0f}")
+
+    shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark the playlist/video database sync.
+
+Compares rows/second of:
+- legacy: one run_query(..., commit=True) per inserted/updated/deleted row
+- bulk:   manage_playlist() (one transaction, executemany UPSERT + batched delete)
+
+Scenarios per size:
+- import:  first import of a new playlist
+- refresh: 10% of videos changed, 5% removed, 5% added
+
+Run from the playlist-fetcher folder:
+    python benchmarks/bench_sync.py
+"""
+import sys
+import time
+
+from common import load_app
+
+SIZES = [1000, 5000]
+
+
+def make_playlist(app, playlist_id, size):
+    playlist = {
+        "playlist_id": playlist_id, "title": playlist_id, "channel": "Bench",
+        "thumbnail": "", "video_count": size,
+    }
+    playlist["hash"] = app.hash_playlist(playlist)
+    videos = [make_video(app, playlist_id, pos, f"Video {pos}") for pos in range(size)]
+    return playlist, videos
+
+
+def make_video(app, playlist_id, pos, title):
+    video = {
+        "vid_id": f"{playlist_id}-v{pos}", "playlist_id": playlist_id, "title": title,
+        "channel": "Bench", "thumbnail": "", "idx_in_playlist": pos,
+    }
+    video["hash"] = app.hash_video(video)
+    return video
+
+
+def mutate(app, playlist_id, videos):
+    """10% retitled, 5% removed, 5% added."""
+    size = len(videos)
+    out = []
+    for pos, v in enumerate(videos):
+        if pos % 20 == 0:
+            continue
+        if pos % 10 == 1:
+            v = make_video(app, playlist_id, pos, f"Video {pos} (edited)")
+        out.append(v)
+    out += [make_video(app, playlist_id, size + n, "New") for n in range(size // 20)]
+    return out
+
+
+def legacy_sync(app, playlist, videos, update):
+    """Previous manage_playlist/manage_videos: one connection + commit per row."""
+    p = playlist
+    if not update:
+        app.run_query(
+            "INSERT INTO playlist (playlist_id, title, channel, thumbnail, video_count, hash) VALUES (?, ?, ?, ?, ?, ?);",
+            (p["playlist_id"], p["title"], p["channel"], p["thumbnail"], p["video_count"], p["hash"]), commit=True)
+        for v in videos:
+            app.run_query(
+                "INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash) VALUES (?, ?, ?, ?, ?, ?, ?);",
+                (v["vid_id"], v["playlist_id"], v["title"], v["channel"], v["thumbnail"], v["idx_in_playlist"], v["hash"]),
+                commit=True)
+        return len(videos)
+
+    app.run_query("UPDATE playlist SET title=?, thumbnail=?, video_count=?, hash=? WHERE playlist_id=?;",
+                  (p["title"], p["thumbnail"], p["video_count"], p["hash"], p["playlist_id"]), commit=True)
+
+    fetched = {v["vid_id"]: v for v in videos}
+    rows = app.run_query("SELECT vid_id, hash FROM video WHERE playlist_id=?", (p["playlist_id"],))
+    stored = {r["vid_id"]: r["hash"] for r in rows}
+    touched = 0
+
+    for vid in fetched.keys() - stored.keys():
+        v = fetched[vid]
+        app.run_query(
+            "INSERT INTO video (vid_id, playlist_id, title, channel, thumbnail, idx_in_playlist, hash) VALUES (?, ?, ?, ?, ?, ?, ?);",
+            (v["vid_id"], v["playlist_id"], v["title"], v["channel"], v["thumbnail"], v["idx_in_playlist"], v["hash"]),
+            commit=True)
+        touched += 1
+    for vid in fetched.keys() & stored.keys():
+        v = fetched[vid]
+        if stored[vid] != v["hash"]:
+            app.run_query("UPDATE video SET title=?, thumbnail=?, idx_in_playlist=?, hash=? WHERE vid_id=?;",
+                          (v["title"], v["thumbnail"], v["idx_in_playlist"], v["hash"], vid), commit=True)
+            touched += 1
+    for vid in stored.keys() - fetched.keys():
+        app.run_query("DELETE FROM video WHERE vid_id=?", (vid,), commit=True)
+        touched += 1
+    return touched
+
+
+def bulk_sync(app, playlist, videos, update):
+    with app.transaction() as conn:
+        before = dict(conn.execute("SELECT vid_id, hash FROM video WHERE playlist_id=?",
+                                   (playlist["playlist_id"],)).fetchall())
+    app.manage_playlist(playlist, videos)
+
+    changed = sum(1 for v in videos if before.get(v["vid_id"]) != v["hash"])
+    removed = len(before.keys() - {v["vid_id"] for v in videos})
+    return changed + removed
+
+
+def main():
+    app = load_app()
+
+    print(f"{'videos':>7} {'scenario':>9} {'mode':>7} {'rows':>6} {'wall (s)':>9} {'rows/s':>9}")
+    for size in SIZES:
+        for mode, sync in (("legacy", legacy_sync), ("bulk", bulk_sync)):
+            playlist_id = f"PL-{mode}-{size}"
+            playlist, videos = make_playlist(app, playlist_id, size)
+
+            for scenario, rows in (("import", videos), ("refresh", mutate(app, playlist_id, videos))):
+                start = time.perf_counter()
+                touched = sync(app, playlist, rows, update=(scenario == "refresh"))
+                elapsed = time.perf_counter() - start
+                print(f"{size:>7} {scenario:>9} {mode:>7} {touched:>6} {elapsed:>9.3f} {touched / elapsed:>9.0f}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
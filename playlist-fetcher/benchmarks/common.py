@@ -0,0 +1,204 @@
+"""
+Shared helpers for playlist-fetcher benchmarks:
+- a local stub of the YouTube Data API (playlists + playlistItems)
+- loading app.py against a throwaway database
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+import socket
+import time
+import tempfile
+import threading
+import importlib
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_SIZE = 50
+
+
+def load_app():
+    """
+    Import app.py with its working directory set to a temp folder,
+    so init_db() creates a fresh youtube.db there.
+    The API rate limit and thumbnail prefetching are turned off.
+    """
+    workdir = tempfile.mkdtemp(prefix="pf-bench-")
+    os.chdir(workdir)
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    app = importlib.import_module("app")
+
+    # Measure the fetch engine, not the API rate limit or thumbnail downloads
+    app.api_limiter.rate = 0
+    app.THUMB_PREFETCH = False
+    return app
+
+
+class StubYouTube:
+    """
+    Minimal YouTube Data API v3 stand-in.
+    playlists: {playlist_id: video_count}
+    latency:   seconds slept before every response (simulated RTT)
+    edits:     {(playlist_id, position): title} overrides video titles
+    titles:    {playlist_id: title} overrides playlist titles
+
+    Fault injection (for the retry engine):
+    error_rate:  share of requests answered with a random code from error_codes
+    slow_rate:   share of requests that sleep slow_latency seconds first
+    outage:      every request fails with 503
+
+    Responses carry an ETag and honour If-None-Match with 304.
+    """
+
+    def __init__(self, playlists, latency=0.02, seed=1):
+        self.playlists = dict(playlists)
+        self.latency = latency
+        self.edits = {}
+        self.titles = {}
+        self.error_rate = 0.0
+        self.error_codes = (500, 503, 429)
+        self.slow_rate = 0.0
+        self.slow_latency = 2.0
+        self.outage = False
+        self.requests = 0
+        self.not_modified = 0
+        self.connections = 0
+        self.errors = 0
+        self.slow = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.server.handle_error = self._handle_error
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/youtube/v3"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handle_error(self, request, client_address):
+        # Clients that timed out hang up mid-response; that's expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            ThreadingHTTPServer.handle_error(self.server, request, client_address)
+
+    # ---------- API payloads ----------
+
+    def playlist_body(self, playlist_id):
+        if playlist_id not in self.playlists:
+            return {"items": []}
+        return {"items": [{
+            "id": playlist_id,
+            "snippet": {
+                "title": self.titles.get(playlist_id, f"Playlist {playlist_id}"),
+                "channelTitle": "Stub Channel",
+                "thumbnails": {"medium": {"url": f"https://i.ytimg.com/pl/{playlist_id}.jpg"}},
+            },
+            "contentDetails": {"itemCount": self.playlists[playlist_id]},
+        }]}
+
+    def items_body(self, playlist_id, page_token):
+        total = self.playlists.get(playlist_id, 0)
+        start = int(page_token or 0)
+        end = min(start + PAGE_SIZE, total)
+
+        items = []
+        for pos in range(start, end):
+            vid = f"{playlist_id}-v{pos}"
+            items.append({
+                "snippet": {
+                    "title": self.edits.get((playlist_id, pos), f"Video {pos}"),
+                    "channelTitle": "Stub Channel",
+                    "position": pos,
+                    "resourceId": {"videoId": vid},
+                    "thumbnails": {"medium": {"url": f"https://i.ytimg.com/vi/{vid}/mq.jpg"}},
+                },
+                "contentDetails": {"videoId": vid},
+            })
+
+        body = {"items": items, "pageInfo": {"totalResults": total}}
+        if end < total:
+            body["nextPageToken"] = str(end)
+        return body
+
+    # ---------- HTTP plumbing ----------
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle stalls
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    slow = stub._rng.random() < stub.slow_rate
+                    fail = stub.outage or stub._rng.random() < stub.error_rate
+                    code = 503 if stub.outage else stub._rng.choice(stub.error_codes)
+                    stub.slow += slow
+                    stub.errors += fail
+                time.sleep(stub.slow_latency if slow else stub.latency)
+
+                if fail:
+                    self.send_response(code)
+                    self.send_header("Content-Length", "0")
+                    if code == 429:
+                        self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+
+                url = urllib.parse.urlsplit(self.path)
+                q = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+
+                if url.path.endswith("/playlists"):
+                    body = stub.playlist_body(q.get("id"))
+                elif url.path.endswith("/playlistItems"):
+                    if q.get("playlistId") not in stub.playlists:
+                        self.send_error(404)
+                        return
+                    body = stub.items_body(q["playlistId"], q.get("pageToken"))
+                else:
+                    self.send_error(404)
+                    return
+
+                raw = json.dumps(body).encode()
+                etag = '"%s"' % hashlib.md5(raw).hexdigest()
+
+                if self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
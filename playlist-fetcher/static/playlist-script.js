@@ -0,0 +1,91 @@
+/* ===============================
+   Infinite Scroll (playlist page)
+=============================== */
+
+const main = document.querySelector("main");
+let loadMore = document.querySelector(".load-more");
+let loading = false;
+
+/**
+ * Build a video card, same markup as playlist.html.
+ */
+function videoItem(video) {
+  const item = document.createElement("div");
+  item.className = "video-item";
+
+  const link = document.createElement("a");
+  link.className = "video-link";
+  link.href = `/video/${encodeURIComponent(video.vid_id)}?playlist_id=${encodeURIComponent(video.playlist_id)}`;
+
+  const img = document.createElement("img");
+  img.src = video.thumbnail;
+  img.alt = "";
+  img.loading = "lazy";
+
+  const info = document.createElement("div");
+  info.className = "video-info";
+
+  const title = document.createElement("h4");
+  title.textContent = video.title;
+
+  const channel = document.createElement("p");
+  channel.textContent = video.channel;
+
+  info.append(title, channel);
+  link.append(img, info);
+  item.append(link);
+  return item;
+}
+
+/**
+ * Fetch the next page and append it before the "Load more" link.
+ */
+async function loadNextPage() {
+  if (loading || !loadMore) return;
+  loading = true;
+
+  try {
+    const response = await fetch(loadMore.dataset.next);
+    if (!response.ok) return;
+
+    const data = await response.json();
+    const items = data.videos.map(videoItem);
+    main.insertBefore(createFragment(items), loadMore);
+
+    if (data.next_after === null) {
+      // Last page reached
+      observer.disconnect();
+      loadMore.remove();
+      loadMore = null;
+    } else {
+      const url = new URL(loadMore.dataset.next, window.location.origin);
+      url.searchParams.set("after", data.next_after);
+      loadMore.dataset.next = url.pathname + url.search;
+    }
+  } finally {
+    loading = false;
+  }
+}
+
+function createFragment(nodes) {
+  const fragment = document.createDocumentFragment();
+  fragment.append(...nodes);
+  return fragment;
+}
+
+// Load the next page when the link scrolls into view
+const observer = new IntersectionObserver(entries => {
+  if (entries.some(entry => entry.isIntersecting)) {
+    loadNextPage();
+  }
+}, { rootMargin: "600px" });
+
+if (loadMore) {
+  observer.observe(loadMore);
+
+  // Keep the link working as a button too
+  loadMore.addEventListener("click", event => {
+    event.preventDefault();
+    loadNextPage();
+  });
+}
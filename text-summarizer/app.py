@@ -1,14 +1,35 @@
-from flask import Flask, render_template, request, redirect, url_for, current_app
+from flask import Flask, render_template, request, url_for, Response
 import os
 import io
 import json
+import re
 import uuid
+import click
+import sqlite3
+import random
 import hashlib
+import unicodedata
+import zipfile
+import shutil
+import tempfile
+import queue
+import threading
+import itertools
 import requests
-from time import time
+from requests.adapters import HTTPAdapter
+from time import time, perf_counter
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
+from array import array
 from datetime import datetime
 
+try:
+    import numpy as np   # optional: needed by the "local" summarizer backend, speeds up MinHash
+except ImportError:
+    np = None
+
 # ===============================
 # Environment & API Configuration
 # ===============================
@@ -18,25 +39,91 @@ load_dotenv()
 
 HF_TOKEN = os.getenv('HF_TOKEN')
 API_URL = "https://router.huggingface.co/hf-inference/models/google-t5/t5-small"
+API_TIMEOUT = 60  # Seconds allowed for one inference request
+API_POOL_SIZE = 8 # Kept-alive connections to the API
+BATCH_WINDOW_MS = 20  # Wait up to this long to batch concurrent texts (0 = no batching)
+BATCH_MAX_ITEMS = 8   # Texts per batched request
+BATCH_SENDERS = 4     # Batched requests in flight at once
 
 # Authorization header for Hugging Face API
 headers = {
     "Authorization": f"Bearer {HF_TOKEN}"
 }
 
+SUMMARIZER_BACKEND = "remote"  # "remote" (Hugging Face API) or "local" (extractive, CPU, needs NumPy)
+LOCAL_SENTENCES = 3            # Sentences kept by the local backend
+
 # ===============================
 # Cache Configuration
 # ===============================
 
-# In-memory cache to avoid repeated API calls
-TEMP_CACHE = {}
-CACHE_TTL = 300  # Cache lifetime (5 minutes)
+CACHE_BACKEND = "memory"   # "memory" (per process) or "sqlite" (shared by all workers)
+CACHE_TTL = 300            # Cache lifetime (5 minutes)
+CACHE_MAX_ENTRIES = 1000   # Max cached summaries
+CACHE_MAX_BYTES = 8 * 1024 * 1024  # Max cached summary text
+CACHE_DB = "cache.db"      # SQLite file (in the instance folder) for the "sqlite" backend
+CACHE_TOUCH_INTERVAL = 30  # Seconds between access time updates of a shared cache entry (LRU precision)
+
+NEAR_DUP_MODE = True        # Serve near-identical texts from the cache
+NEAR_DUP_THRESHOLD = 0.9    # Min estimated Jaccard similarity (word 3-grams) for a near hit
+NEAR_DUP_SHINGLE = 3        # Words per shingle
+NEAR_DUP_PERMS = 128        # MinHash signature length
+NEAR_DUP_BANDS = 32         # LSH bands (NEAR_DUP_PERMS / bands values each)
+NEAR_DUP_MIN_WORDS = 20     # Shorter texts only match after normalization, never "near"
+NEAR_DUP_MAX_ENTRIES = 5000 # Texts kept in the near-duplicate index
+
+# ===============================
+# Storage Configuration
+# ===============================
+
+SUMMARY_DB = "summaries.db"   # SQLite file in the instance folder
+DB_BUSY_TIMEOUT = 5           # Seconds to wait on a locked database
+LIBRARY_PAGE_SIZE = 20        # Summaries per library page
+LIBRARY_PAGE_MAX = 100        # Largest page the library API serves
+
+# ===============================
+# Job Queue Configuration
+# ===============================
+
+SUMMARY_WORKERS = 4   # Summaries computed at the same time
+JOB_HISTORY = 500     # Finished jobs kept for polling
+SSE_KEEPALIVE = 15    # Seconds between keep-alive comments on event streams
+JOB_TIMEOUT = 300     # Seconds a waiting (non-async) /summarize request waits for its job
+
+# ===============================
+# Long Document Configuration
+# ===============================
+
+LONG_DOC_MODE = True   # Map-reduce texts longer than the model input
+CHUNK_TOKENS = 450     # Max tokens per chunk (t5-small reads 512, minus prompt)
+CHUNK_WORKERS = 4      # Chunks summarized at the same time
+MAX_REDUCE_LEVELS = 3  # Combine rounds before the rest is sent as one input
+MAX_TEXT_CHARS = 50000 # Longest text accepted by /summarize
+CHUNK_MAX_ENTRIES = 20000     # Chunk summaries kept in summaries.db (least recently used dropped)
+CHUNK_PRUNE_EVERY = 100       # Chunk summaries written (per process) between prunes
+CHUNK_TOUCH_INTERVAL = 60 * 60  # Seconds between access time updates of a chunk (LRU precision)
+
+# ===============================
+# Bulk Configuration
+# ===============================
+
+BULK_WORKERS = 4          # Documents of one bulk run summarized at the same time
+BULK_STORE_BATCH = 100    # Summaries written to the store per transaction
+BULK_MAX_DOC_BYTES = 4 * MAX_TEXT_CHARS  # Largest zip member read as a document
+
+# ===============================
+# Metrics Configuration
+# ===============================
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)  # Seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144)  # Bytes
+PROFILE_HEADER = "X-Profile"  # Request header asking for a Server-Timing breakdown
 
 # ===============================
 # Flask App Initialization
 # ===============================
 
-app = Flask(__name__, instance_relative_config=True)
+app = Flask(__name__, instance_relative_config=True, instance_path=os.getenv("SUMMARIZER_INSTANCE"))
 
 # ===============================
 # Utility Helpers
@@ -50,45 +137,1766 @@ def text_hash(text):
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def cleanup_cache():
+def summaries_path():
+    """Path of the old JSON summaries file (imported into the database)."""
+    return os.path.join(app.instance_path, "summaries.json")
+
+# ===============================
+# Metrics
+# ===============================
+
+def _labels(names, values):
+    """Prometheus label set: {a="x",b="y"} (values escaped)."""
+    if not names:
+        return ""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{n}="{escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    """Monotonic counter, one value per label combination. Thread-safe."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _labels(self.labels, key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (plus sum and count) per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}   # labels → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        with self._lock:
+            row = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                for bound, count in zip(self.buckets + (float("inf"),), row[:-2] + [row[-1]]):
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    out.append((f"{self.name}_bucket", _labels(self.labels + ("le",), key + (le,)), count))
+                out.append((f"{self.name}_sum", _labels(self.labels, key), round(row[-2], 6)))
+                out.append((f"{self.name}_count", _labels(self.labels, key), row[-1]))
+        return out
+
+
+class Gauge:
+    """Value read at scrape time from fn() → {label values: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, labels=()):
+        self.name, self.help, self.labels, self.fn = name, help, tuple(labels), fn
+        METRICS.append(self)
+
+    def samples(self):
+        return [(self.name, _labels(self.labels, key), value) for key, value in self.fn().items()]
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{name}{labels} {value}" for name, labels, value in metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+METRICS = []
+
+STAGE_SECONDS = Histogram("summarizer_stage_seconds", "Time spent per summarization stage", ["stage"])
+HTTP_SECONDS = Histogram("summarizer_http_request_seconds", "HTTP request latency", ["endpoint", "status"])
+CACHE_RESULTS = Counter("summarizer_cache_results_total",
+                        "Summary lookups by the tier that answered (miss: summarizer called)", ["scope", "tier"])
+UPSTREAM_REQUESTS = Counter("summarizer_upstream_requests_total", "Inference API requests sent")
+UPSTREAM_ERRORS = Counter("summarizer_upstream_errors_total", "Failed inference API requests", ["reason"])
+TEXT_BYTES = Histogram("summarizer_text_bytes", "Size of texts posted to /summarize", buckets=SIZE_BUCKETS)
+UPSTREAM_BYTES = Histogram("summarizer_upstream_bytes", "Inference API payload sizes", ["direction"],
+                           buckets=SIZE_BUCKETS)
+CACHE_ENTRIES = Gauge("summarizer_cache_entries", "Summaries held in TEMP_CACHE",
+                      lambda: {(): TEMP_CACHE.status()["entries"]})
+CACHE_BYTES = Gauge("summarizer_cache_bytes", "Size of the summaries held in TEMP_CACHE",
+                    lambda: {(): TEMP_CACHE.status()["bytes"]})
+
+# Per-request timing breakdown (PROFILE_HEADER), collected per thread
+_profile = threading.local()
+
+
+def observe_stage(name, seconds):
+    """Record a stage duration (histogram + current profile, if any)."""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = getattr(_profile, "timings", None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0) + seconds
+
+
+def merge_profile(timings):
+    """Add stage timings measured on another thread to the current profile, if any."""
+    current = getattr(_profile, "timings", None)
+    if timings and current is not None:
+        for name, seconds in timings.items():
+            current[name] = current.get(name, 0) + seconds
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as a summarization stage."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, perf_counter() - start)
+
+# ===============================
+# Summary Store (SQLite)
+# ===============================
+
+# Per-thread SQLite connections
+_db = threading.local()
+
+
+def db_path():
+    """Path of the summaries database (works outside requests too)."""
+    return os.path.join(app.instance_path, SUMMARY_DB)
+
+
+def get_db():
+    """
+    Connection to the summaries database for the calling thread.
+    Opened once per thread in WAL mode (readers never block the writer).
+    """
+    conn = getattr(_db, "conn", None)
+    if conn is None or getattr(_db, "pid", None) != os.getpid():
+        conn = sqlite3.connect(db_path(), timeout=DB_BUSY_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        _db.conn, _db.pid = conn, os.getpid()
+    return conn
+
+
+# Summary table: seq is an explicit INTEGER PRIMARY KEY (the FTS rowid and
+# the library cursor tiebreak); implicit rowids may be renumbered by VACUUM
+SUMMARY_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        seq INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        hash TEXT NOT NULL,
+        summary TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    );
+"""
+
+
+def init_db():
+    """
+    Create the summaries table and indexes if they don't exist,
+    then import the old summaries.json once (see migrate_json).
+    Runs under the write lock, so workers starting at once don't race.
+    """
+    os.makedirs(app.instance_path, exist_ok=True)
+    conn = get_db()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        upgrade_summary_table(conn)
+        conn.execute(SUMMARY_TABLE.format(name="summary"))
+        # O(1)-ish lookup by text hash; also rejects duplicate saves
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS summary_hash_idx ON summary(hash);")
+        # Library pages by date (seq breaks ties; as the rowid alias it's part of every index)
+        conn.execute("CREATE INDEX IF NOT EXISTS summary_created_idx ON summary(created_at);")
+        init_fts(conn)
+
+        # Summaries of long-document chunks (see summarize_long), kept apart from the library
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk (
+                hash TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                accessed REAL NOT NULL
+            );
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS chunk_accessed_idx ON chunk(accessed);")
+
+    if os.path.exists(summaries_path()):
+        migrate_json(summaries_path())
+
+
+def upgrade_summary_table(conn):
+    """
+    Rebuild a summary table from before seq (keyed by its TEXT id):
+    rows keep their rowid as seq, so library cursors handed out stay valid.
+    The FTS index is dropped and rebuilt on seq by init_fts.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(summary);")}
+    if not columns or "seq" in columns:
+        return
+
+    for trigger in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS summary_fts_{trigger};")
+    conn.execute("DROP TABLE IF EXISTS summary_fts;")
+
+    conn.execute(SUMMARY_TABLE.format(name="summary_new"))
+    conn.execute("""
+        INSERT INTO summary_new (seq, id, hash, summary, created_at)
+        SELECT rowid, id, hash, summary, created_at FROM summary;
+    """)
+    conn.execute("DROP TABLE summary;")
+    conn.execute("ALTER TABLE summary_new RENAME TO summary;")
+
+
+def init_fts(conn):
+    """
+    Create the FTS5 index summary_fts over the summary text.
+    External content (no second copy of the text); triggers keep it
+    in sync with inserts and deletes. Built from existing rows the first time.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='summary_fts';").fetchone()
+    if exists:
+        return
+
+    conn.execute("CREATE VIRTUAL TABLE summary_fts USING fts5(summary, content='summary', content_rowid='seq');")
+    conn.execute("""
+        CREATE TRIGGER summary_fts_insert AFTER INSERT ON summary BEGIN
+            INSERT INTO summary_fts (rowid, summary) VALUES (new.seq, new.summary);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER summary_fts_delete AFTER DELETE ON summary BEGIN
+            INSERT INTO summary_fts (summary_fts, rowid, summary) VALUES ('delete', old.seq, old.summary);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER summary_fts_update AFTER UPDATE OF summary ON summary BEGIN
+            INSERT INTO summary_fts (summary_fts, rowid, summary) VALUES ('delete', old.seq, old.summary);
+            INSERT INTO summary_fts (rowid, summary) VALUES (new.seq, new.summary);
+        END;
+    """)
+    conn.execute("INSERT INTO summary_fts (summary_fts) VALUES ('rebuild');")
+
+
+def migrate_json(json_path):
+    """
+    One-shot import of a summaries.json file into the database.
+    Entries already stored (same hash) are skipped; the file is
+    renamed to *.migrated afterwards so it isn't imported again.
+    Runs under the database write lock, so when several workers start
+    at once only the first imports; the others find the file gone.
+    Returns the number of summaries imported.
+    """
+    conn = get_db()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            with open(json_path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+
+        imported = conn.executemany("""
+            INSERT OR IGNORE INTO summary (id, hash, summary, created_at)
+            VALUES (:id, :hash, :summary, :created_at);
+        """, [
+            {
+                "id": item.get("id") or str(uuid.uuid4()),
+                "hash": item["hash"],
+                "summary": item["summary"],
+                "created_at": item.get("created_at") or datetime.now().strftime("%Y-%m-%d %H:%M"),
+            }
+            for item in data if item.get("hash") and item.get("summary")
+        ]).rowcount
+
+        os.replace(json_path, json_path + ".migrated")
+    return imported
+
+
+def find_summary(hash_id):
+    """Saved summary text for a text hash, or None."""
+    row = get_db().execute("SELECT summary FROM summary WHERE hash=?", (hash_id,)).fetchone()
+    return row["summary"] if row else None
+
+
+def store_summary(hash_id, summary_text):
+    """
+    Save a summary unless its hash is already saved.
+    A single INSERT, so concurrent saves can't clobber each other.
+    Returns True if a new row was written.
+    """
+    conn = get_db()
+    with conn:
+        cur = conn.execute("""
+            INSERT INTO summary (id, hash, summary, created_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(hash) DO NOTHING;
+        """, (str(uuid.uuid4()), hash_id, summary_text, datetime.now().strftime("%Y-%m-%d %H:%M")))
+    return cur.rowcount > 0
+
+
+def store_summaries(rows):
+    """
+    Save many (hash, summary) pairs in one transaction; hashes already
+    saved are skipped. Returns the number of rows written.
+    """
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+    conn = get_db()
+    with conn:
+        cur = conn.executemany("""
+            INSERT INTO summary (id, hash, summary, created_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(hash) DO NOTHING;
+        """, [(str(uuid.uuid4()), hash_id, summary_text, created_at) for hash_id, summary_text in rows])
+    return cur.rowcount
+
+
+def remove_summary(summary_id):
+    """Delete a saved summary by id. Returns True if it existed."""
+    conn = get_db()
+    with conn:
+        cur = conn.execute("DELETE FROM summary WHERE id=?", (summary_id,))
+    return cur.rowcount > 0
+
+
+def fts_query(text):
+    """
+    Turn user input into a safe FTS5 query:
+    every word must match, the last one as a prefix.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def list_summaries(after=None, sort="newest", query=None, per_page=LIBRARY_PAGE_SIZE):
+    """
+    One page of saved summaries by date ("newest" or "oldest" first),
+    optionally only those matching a text search.
+    Keyset pagination on summary_created_idx: `after` is the cursor
+    ("<created_at>|<seq>") of the previous page's last row, so a page
+    costs the same however deep it is.
+    Returns (summaries, next_after): None when there is no next page.
+    """
+    order, cmp = ("ASC", ">") if sort == "oldest" else ("DESC", "<")
+    where, params = [], []
+
+    if query:
+        match = fts_query(query)
+        if not match:
+            return [], None
+        where.append("seq IN (SELECT rowid FROM summary_fts WHERE summary_fts MATCH ?)")
+        params.append(match)
+
+    if after:
+        created_at, _, seq = after.rpartition("|")
+        if not seq.isdigit():
+            return [], None
+        where.append(f"(created_at, seq) {cmp} (?, ?)")
+        params += [created_at, int(seq)]
+
+    rows = get_db().execute(f"""
+        SELECT seq, id, hash, summary, created_at FROM summary
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY created_at {order}, seq {order}
+        LIMIT ?;
+    """, params + [per_page + 1]).fetchall()
+
+    next_after = None
+    if len(rows) > per_page:
+        last = rows[per_page - 1]
+        next_after = f"{last['created_at']}|{last['seq']}"
+    return [{k: r[k] for k in ("id", "hash", "summary", "created_at")} for r in rows[:per_page]], next_after
+
+
+# Initialize database at startup
+init_db()
+
+# ===============================
+# Summary Cache
+# ===============================
+
+class MemoryCache:
+    """
+    In-process LRU cache with a fixed TTL, bounded by entry count and bytes.
+    - LRU order: self._lru (moved to the end on every hit)
+    - expiry order: self._expiry (insertion order == expiry order,
+      since every entry lives CACHE_TTL seconds), so expired entries
+      are dropped from its head: O(1) per request, no full scans
+    Thread-safe.
+    """
+
+    name = "memory"
+
+    def __init__(self, ttl, max_entries, max_bytes):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()      # key → (value, size)
+        self._expiry = OrderedDict()   # key → expires at
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def _drop(self, key):
+        _, size = self._lru.pop(key)
+        del self._expiry[key]
+        self._bytes -= size
+
+    def _expire(self, now):
+        while self._expiry:
+            key, expires = next(iter(self._expiry.items()))
+            if expires > now:
+                return
+            self._drop(key)
+            self._stats["expired"] += 1
+
+    def get(self, key):
+        """Cached value, or None on a miss."""
+        with self._lock:
+            self._expire(time())
+            entry = self._lru.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._lru.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store a value (restarting its TTL), evicting LRU entries over budget."""
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._lru:
+                self._drop(key)
+
+            self._lru[key] = (value, size)
+            self._expiry[key] = time() + self.ttl
+            self._bytes += size
+
+            self._expire(time())
+            while self._lru and (len(self._lru) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._lru)))
+                self._stats["evictions"] += 1
+
+    def status(self):
+        """Usage numbers for sizing the cache."""
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": len(self._lru),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                **self._stats,
+            }
+
+
+class SQLiteCache:
+    """
+    LRU + TTL cache in a local SQLite file, shared by every worker
+    process on the machine (e.g. gunicorn workers), so a summary
+    computed by one worker is a hit in all the others.
+    - expiry and LRU eviction run on indexes (expires, accessed) and
+      only touch the rows they drop
+    - entry and byte totals live in the one-row cache_meta table, kept
+      up to date by triggers in the same transaction (no COUNT scans)
+    - hits update the access time at most every CACHE_TOUCH_INTERVAL
+      seconds, so most reads don't take the write lock
+    Hit/miss counters are per process.
+    """
+
+    name = "shared"
+
+    def __init__(self, path, ttl, max_entries, max_bytes):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires REAL NOT NULL,
+                    accessed REAL NOT NULL
+                );
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_idx ON cache(expires);")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_idx ON cache(accessed);")
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    entries INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL
+                );
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_meta_insert AFTER INSERT ON cache BEGIN
+                    UPDATE cache_meta SET entries = entries + 1, bytes = bytes + new.size;
+                END;
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_meta_delete AFTER DELETE ON cache BEGIN
+                    UPDATE cache_meta SET entries = entries - 1, bytes = bytes - old.size;
+                END;
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_meta_update AFTER UPDATE OF size ON cache BEGIN
+                    UPDATE cache_meta SET bytes = bytes + new.size - old.size;
+                END;
+            """)
+            # Totals of an existing cache file, counted once
+            conn.execute("""
+                INSERT OR IGNORE INTO cache_meta (id, entries, bytes)
+                SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache;
+            """)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _count(self, stat, n=1):
+        with self._lock:
+            self._stats[stat] += n
+
+    def get(self, key):
+        """Cached value, or None on a miss (or expired)."""
+        conn = self._conn()
+        now = time()
+        row = conn.execute("SELECT value, accessed FROM cache WHERE key=? AND expires > ?", (key, now)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+
+        if now - row[1] > CACHE_TOUCH_INTERVAL:
+            with conn:
+                conn.execute("UPDATE cache SET accessed=? WHERE key=?", (now, key))
+        self._count("hits")
+        return row[0]
+
+    def put(self, key, value):
+        """Store a value, then drop expired and least recently used rows over budget."""
+        conn = self._conn()
+        now = time()
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with conn:
+            # Upsert (not REPLACE), so the update trigger keeps the byte total right
+            conn.execute("""
+                INSERT INTO cache (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value=excluded.value, size=excluded.size,
+                    expires=excluded.expires, accessed=excluded.accessed;
+            """, (key, value, size, now + self.ttl, now))
+            expired = conn.execute("DELETE FROM cache WHERE expires <= ?", (now,)).rowcount
+
+            entries, total = conn.execute("SELECT entries, bytes FROM cache_meta").fetchone()
+            evicted = 0
+            if entries > self.max_entries or total > self.max_bytes:
+                # Walk the LRU end of the index only as far as needed
+                for old_size, in conn.execute("SELECT size FROM cache ORDER BY accessed"):
+                    if entries - evicted <= self.max_entries and total <= self.max_bytes:
+                        break
+                    total -= old_size
+                    evicted += 1
+                conn.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                             (evicted,))
+
+        self._count("expired", expired)
+        self._count("evictions", evicted)
+
+    def status(self):
+        """Usage numbers for sizing the cache."""
+        conn = self._conn()
+        with conn:
+            expired = conn.execute("DELETE FROM cache WHERE expires <= ?", (time(),)).rowcount
+            entries, total = conn.execute("SELECT entries, bytes FROM cache_meta").fetchone()
+        self._count("expired", expired)
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": entries,
+                "bytes": total,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                **self._stats,
+            }
+
+
+def make_cache():
+    """Build the summary cache selected by CACHE_BACKEND."""
+    if CACHE_BACKEND == "sqlite":
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = os.path.join(app.instance_path, CACHE_DB)
+        return SQLiteCache(path, CACHE_TTL, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+    return MemoryCache(CACHE_TTL, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+
+# Cache of recent summaries, to avoid repeated API calls
+TEMP_CACHE = make_cache()
+
+# ===============================
+# Near-Duplicate Detection
+# ===============================
+
+CANON_WORD = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+
+# MinHash permutations (multiply-shift hashes); fixed seed so every
+# process computes the same signatures
+_perm_rng = random.Random(20240601)
+_PERM_A = [_perm_rng.getrandbits(64) | 1 for _ in range(NEAR_DUP_PERMS)]
+_PERM_B = [_perm_rng.getrandbits(64) for _ in range(NEAR_DUP_PERMS)]
+
+
+def canonical_text(text):
+    """
+    Text reduced to its words: Unicode-normalized, case-folded,
+    punctuation dropped, single spaces.
     """
-    Remove expired entries from in-memory cache.
+    return " ".join(CANON_WORD.findall(unicodedata.normalize("NFKC", text).casefold()))
+
+
+def minhash(words):
     """
+    MinHash signature (NEAR_DUP_PERMS 32-bit values) of the word
+    NEAR_DUP_SHINGLE-grams. Vectorized with NumPy when available.
+    """
+    n = NEAR_DUP_SHINGLE
+    shingles = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+    xs = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+          for s in shingles]
+
+    if np is not None:
+        a = np.array(_PERM_A, dtype=np.uint64)[:, None]
+        b = np.array(_PERM_B, dtype=np.uint64)[:, None]
+        x = np.array(xs, dtype=np.uint64)
+        return array("I", ((a * x + b) >> np.uint64(32)).min(axis=1).astype(np.uint32).tobytes())
+
+    return array("I", (min(((a * x + b) & _MASK64) >> 32 for x in xs) for a, b in zip(_PERM_A, _PERM_B)))
+
+
+class NearDuplicateIndex:
+    """
+    Finds earlier texts that are the same, or nearly the same, as a new one.
+    - canonical hash: equal after canonical_text() (case, spacing, punctuation)
+    - near duplicate: MinHash signatures, LSH-banded (NEAR_DUP_BANDS bands),
+      estimated Jaccard similarity >= threshold
+    Texts under min_words words only match canonically.
+    Bounded to max_entries (oldest dropped). Thread-safe, per process.
+    """
+
+    def __init__(self, threshold, bands, max_entries, min_words):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NEAR_DUP_PERMS // bands
+        self.max_entries = max_entries
+        self.min_words = min_words
+        self._entries = OrderedDict()   # text hash → (canonical hash, signature)
+        self._canonical = {}            # canonical hash → text hash
+        self._buckets = {}              # (band, band values) → {text hash}
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "canonical_hits": 0, "near_hits": 0, "misses": 0,
+                       "candidates": 0, "rejected": 0, "stale": 0}
+        self._similarity = 0.0          # sum over near hits
+
+    def _fingerprint(self, text):
+        canon = canonical_text(text)
+        words = canon.split()
+        signature = minhash(words) if len(words) >= self.min_words else None
+        return hashlib.sha256(canon.encode("utf-8")).hexdigest(), signature
+
+    def _band_keys(self, signature):
+        raw = signature.tobytes()
+        step = self.rows * signature.itemsize
+        return [(band, raw[band * step:(band + 1) * step]) for band in range(self.bands)]
+
+    def _drop(self, hash_id):
+        canon, signature = self._entries.pop(hash_id)
+        if self._canonical.get(canon) == hash_id:
+            del self._canonical[canon]
+        if signature is not None:
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket:
+                    bucket.discard(hash_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def add(self, text, hash_id):
+        """Index a text whose summary is cached under hash_id."""
+        with self._lock:
+            if hash_id in self._entries:
+                self._entries.move_to_end(hash_id)
+                return
+
+        canon, signature = self._fingerprint(text)
+
+        with self._lock:
+            if hash_id in self._entries:
+                return
+            self._entries[hash_id] = (canon, signature)
+            self._canonical[canon] = hash_id
+            if signature is not None:
+                for key in self._band_keys(signature):
+                    self._buckets.setdefault(key, set()).add(hash_id)
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def find(self, text, lookup):
+        """
+        Summary of an indexed text matching this one.
+        lookup(hash) → (summary, source) fetches it; entries whose
+        summary is gone are dropped.
+        Returns (summary, source, {"hash", "match", "similarity"}) or None.
+        """
+        canon, signature = self._fingerprint(text)
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            matches = []
+            if canon in self._canonical:
+                matches.append((1.0, "canonical", self._canonical[canon]))
+
+            if signature is not None:
+                candidates = set()
+                for key in self._band_keys(signature):
+                    candidates |= self._buckets.get(key, set())
+                candidates.discard(self._canonical.get(canon))
+                self._stats["candidates"] += len(candidates)
+
+                for hash_id in candidates:
+                    other = self._entries[hash_id][1]
+                    similarity = sum(x == y for x, y in zip(signature, other)) / len(signature)
+                    if similarity >= self.threshold:
+                        matches.append((similarity, "near", hash_id))
+                    else:
+                        self._stats["rejected"] += 1
+                matches.sort(key=lambda m: -m[0])
+
+        for similarity, kind, hash_id in matches:
+            summary_text, source = lookup(hash_id)
+            with self._lock:
+                if summary_text is None:
+                    self._stats["stale"] += 1
+                    if hash_id in self._entries:
+                        self._drop(hash_id)
+                    continue
+
+                self._stats[f"{kind}_hits"] += 1
+                if kind == "near":
+                    self._similarity += similarity
+            return summary_text, source, {"hash": hash_id, "match": kind, "similarity": round(similarity, 3)}
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def status(self):
+        """Hit rates and match quality numbers for tuning the threshold."""
+        with self._lock:
+            stats = dict(self._stats)
+            hits = stats["canonical_hits"] + stats["near_hits"]
+            return {
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "bands": self.bands,
+                "rows": self.rows,
+                **stats,
+                "hit_rate": round(hits / stats["lookups"], 3) if stats["lookups"] else None,
+                # LSH candidates that failed the similarity check (false matches caught)
+                "false_candidate_rate": (round(stats["rejected"] / stats["candidates"], 3)
+                                         if stats["candidates"] else None),
+                "avg_near_similarity": (round(self._similarity / stats["near_hits"], 3)
+                                        if stats["near_hits"] else None),
+            }
+
+
+near_duplicates = NearDuplicateIndex(NEAR_DUP_THRESHOLD, NEAR_DUP_BANDS, NEAR_DUP_MAX_ENTRIES, NEAR_DUP_MIN_WORDS)
+
+# Chunk summaries written by this process (prune schedule)
+_chunk_writes = itertools.count(1)
+
+
+def find_chunk(hash_id):
+    """
+    Stored summary of a long-document chunk, or None.
+    Refreshes its access time at most every CHUNK_TOUCH_INTERVAL seconds.
+    """
+    conn = get_db()
+    row = conn.execute("SELECT summary, accessed FROM chunk WHERE hash=?", (hash_id,)).fetchone()
+    if row is None:
+        return None
+
     now = time()
-    expired_keys = []
+    if now - row["accessed"] > CHUNK_TOUCH_INTERVAL:
+        with conn:
+            conn.execute("UPDATE chunk SET accessed=? WHERE hash=?", (now, hash_id))
+    return row["summary"]
+
+
+def store_chunk(hash_id, summary_text):
+    """
+    Save a chunk summary. Every CHUNK_PRUNE_EVERY writes, the least
+    recently used chunks over CHUNK_MAX_ENTRIES are dropped (one
+    indexed DELETE; the index walk is shared by that many writes).
+    """
+    conn = get_db()
+    with conn:
+        conn.execute("""
+            INSERT INTO chunk (hash, summary, accessed) VALUES (?, ?, ?)
+            ON CONFLICT(hash) DO UPDATE SET summary=excluded.summary, accessed=excluded.accessed;
+        """, (hash_id, summary_text, time()))
+        if next(_chunk_writes) % CHUNK_PRUNE_EVERY == 0:
+            conn.execute("""
+                DELETE FROM chunk WHERE hash IN
+                    (SELECT hash FROM chunk ORDER BY accessed DESC LIMIT -1 OFFSET ?);
+            """, (CHUNK_MAX_ENTRIES,))
+
+# ===============================
+# Summarization
+# ===============================
+
+class SummaryError(Exception):
+    """Summarization failed; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+
+def lookup_summary(hash_id):
+    """
+    Find an existing summary for a text hash.
+    Lookup order:
+    1. Temporary cache (TEMP_CACHE)
+    2. Saved summaries (indexed by hash)
+    Returns (summary, "memory" | "shared" | "disk"), or (None, None) if not found.
+    """
+    # 1. Temporary cache
+    with stage("cache"):
+        summary_text = TEMP_CACHE.get(hash_id)
+    if summary_text is not None:
+        return summary_text, TEMP_CACHE.name
+
+    # 2. Persistent store
+    with stage("store"):
+        summary_text = find_summary(hash_id)
+    if summary_text is not None:
+        TEMP_CACHE.put(hash_id, summary_text)
+        return summary_text, "disk"
+
+    return None, None
+
+
+def find_cached(text, hash_id, scope="request"):
+    """
+    The cache steps of the summarize pipeline:
+    lookup_summary(), then a normalized / near-duplicate match.
+    Counts the answering tier in CACHE_RESULTS under `scope`.
+    Returns (summary, cached, near) — near is the match info of a
+    near-duplicate hit, else None — or None on a miss.
+    """
+    summary_text, cached = lookup_summary(hash_id)
+    if summary_text is not None:
+        CACHE_RESULTS.inc(scope=scope, tier=cached)
+        return summary_text, cached, None
+
+    if NEAR_DUP_MODE:
+        with stage("near_duplicate"):
+            match = near_duplicates.find(text, lookup_summary)
+        if match:
+            summary_text, cached, near = match
+            CACHE_RESULTS.inc(scope=scope, tier=near["match"])
+            TEMP_CACHE.put(hash_id, summary_text)
+            return summary_text, cached, near
+
+    CACHE_RESULTS.inc(scope=scope, tier="miss")
+    return None
+
+
+def call_summary_api(text):
+    """
+    Summarize text with the Hugging Face API.
+    Concurrent calls are micro-batched into one request (see MicroBatcher)
+    unless BATCH_WINDOW_MS is 0.
+    Raises SummaryError on timeouts and failed requests.
+    """
+    if BATCH_WINDOW_MS and BATCH_MAX_ITEMS > 1:
+        future = api_batcher.submit(text)
+        try:
+            return future.result()
+        finally:
+            # The request ran on a sender thread; count its time here too
+            merge_profile(getattr(future, "timings", None))
+    return post_inputs([text])[0]
+
+
+def post_inputs(texts):
+    """
+    Send texts to the API in one request (a single text as a plain
+    string, several as an `inputs` list). Returns their summaries in order.
+    """
+    prompts = [f"summarize: {text}" for text in texts]
+    payload = {
+        "inputs": prompts[0] if len(prompts) == 1 else prompts,
+        "parameters": {
+            "max_length": 120,
+            "min_length": 30
+        }
+    }
+
+    body = json.dumps(payload).encode("utf-8")
+    UPSTREAM_REQUESTS.inc()
+    UPSTREAM_BYTES.observe(len(body), direction="request")
+
+    try:
+        with stage("upstream"):
+            response = hf_session.post(API_URL, headers={**headers, "Content-Type": "application/json"},
+                                 data=body, timeout=API_TIMEOUT)
+    except requests.Timeout:
+        UPSTREAM_ERRORS.inc(reason="timeout")
+        raise SummaryError("API request timed out", 504)
+    except requests.RequestException:
+        UPSTREAM_ERRORS.inc(reason="connection")
+        raise SummaryError("API request failed")
+
+    UPSTREAM_BYTES.observe(len(response.content), direction="response")
+    if response.status_code != 200:
+        UPSTREAM_ERRORS.inc(reason=f"http_{response.status_code}")
+        raise SummaryError("API request failed")
+
+    try:
+        result = response.json()
+    except ValueError:
+        UPSTREAM_ERRORS.inc(reason="bad_response")
+        raise SummaryError("API returned an invalid response")
+    if len(result) != len(texts):
+        UPSTREAM_ERRORS.inc(reason="bad_response")
+        raise SummaryError("API returned a wrong number of summaries")
+
+    summaries = []
+    for item in result:
+        # Batched answers may nest each result in its own list
+        item = item[0] if isinstance(item, list) else item
+        summaries.append(item.get("summary_text") or item["translation_text"])
+    return summaries
+
+
+class MicroBatcher:
+    """
+    Groups concurrent calls into batches:
+    a batch is sent once it has `max_items` texts, or `window` seconds
+    after its first text arrived, whichever comes first.
+    Batches are sent by a small pool (`senders`), so a slow batch
+    doesn't hold back the next one. Each caller gets a Future; its
+    `timings` attribute holds the batch's stage timings (upstream).
+    """
+
+    def __init__(self, send, window, max_items, senders):
+        self.send = send
+        self.window = window
+        self.max_items = max_items
+        self.senders = senders
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._stats = {"batches": 0, "items": 0, "largest": 0}
+
+    def _start(self):
+        # Started on first use (and again after a fork)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pool = ThreadPoolExecutor(max_workers=self.senders, thread_name_prefix="hf-batch")
+                threading.Thread(target=self._collect, daemon=True, name="hf-batcher").start()
+                self._pid = os.getpid()
+
+    def submit(self, text):
+        """Queue a text; returns a Future resolving to its summary."""
+        if self._pid != os.getpid():
+            self._start()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self):
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            deadline = time() + self.window
+            while len(batch) < self.max_items:
+                remaining = deadline - time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._pool.submit(self._send, batch)
+
+    def _send(self, batch):
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["largest"] = max(self._stats["largest"], len(batch))
+        _profile.timings = {}
+        try:
+            summaries = self.send([text for text, _ in batch])
+        except Exception as e:
+            summaries, error = None, e
+        timings, _profile.timings = _profile.timings, None
+
+        for i, (_, future) in enumerate(batch):
+            future.timings = timings
+            if summaries is None:
+                future.set_exception(error)
+            else:
+                future.set_result(summaries[i])
+
+    def status(self):
+        """Batch counts and sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_size"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["window_ms"] = self.window * 1000
+        stats["max_items"] = self.max_items
+        return stats
+
+
+# Pooled keep-alive connections to the inference API, shared by all threads
+hf_session = requests.Session()
+hf_session.mount("https://", HTTPAdapter(pool_maxsize=API_POOL_SIZE))
+hf_session.mount("http://", HTTPAdapter(pool_maxsize=API_POOL_SIZE))
+
+api_batcher = MicroBatcher(post_inputs, BATCH_WINDOW_MS / 1000, BATCH_MAX_ITEMS, BATCH_SENDERS)
+
+
+def run_backend(text, progress=None):
+    """
+    Summarize one model-sized text with the backend (no cache lookup).
+    With a progress callback and a backend that can stream, each piece
+    of output is passed to progress() as it is produced.
+    """
+    with stage("backend"):
+        if progress and hasattr(summarizer, "stream"):
+            pieces = []
+            for piece in summarizer.stream(text):
+                progress({"stage": "output", "index": len(pieces), "total": None, "text": piece})
+                pieces.append(piece)
+            return " ".join(pieces)
+        return summarizer.summarize(text)
+
+
+def summarize_chunk(text, hash_id):
+    """
+    Summary of one chunk of a long document, looked up in and saved to
+    the chunk store (find_chunk / store_chunk), which outlives TEMP_CACHE.
+    Returns (summary, cached): cached is set when the summary was
+    already stored (by an earlier request or a previous document).
+    """
+    with stage("store"):
+        summary_text = find_chunk(hash_id)
+    cached = "disk" if summary_text is not None else None
+    CACHE_RESULTS.inc(scope="chunk", tier=cached or "miss")
+    if summary_text is not None:
+        return summary_text, cached
+
+    summary_text = run_backend(text)
+    store_chunk(hash_id, summary_text)
+    return summary_text, False
+
+
+def generate_summary(text, hash_id, progress=None):
+    """
+    Summarize text and keep the result in TEMP_CACHE.
+    Callers have already missed the caches (find_cached), so this
+    goes straight to the backend.
+    Texts longer than the backend's input limit go through summarize_long().
+    progress(part) receives partial output while it is produced
+    (see run_backend and summarize_long).
+    Returns (summary, details): details holds chunk counts and
+    per-stage timings for long documents, None otherwise.
+    """
+    details = None
+    if LONG_DOC_MODE and summarizer.max_tokens and count_tokens(text) > summarizer.max_tokens:
+        summary_text, details = summarize_long(text, progress)
+    else:
+        summary_text = run_backend(text, progress)
+
+    TEMP_CACHE.put(hash_id, summary_text)
+    return summary_text, details
+
+# ===============================
+# Summarizer Backends
+# ===============================
+
+class RemoteSummarizer:
+    """
+    Abstractive summaries from the Hugging Face API (t5-small),
+    micro-batched. Inputs are limited to CHUNK_TOKENS.
+    """
+
+    name = "remote"
+    max_tokens = CHUNK_TOKENS
+
+    def summarize(self, text):
+        return call_summary_api(text)
+
+
+class LocalSummarizer:
+    """
+    Extractive summaries on the local CPU, no network:
+    TextRank over TF-IDF sentence vectors (NumPy).
+    - sentences → TF-IDF rows (L2-normalized)
+    - cosine similarity graph → PageRank by power iteration
+    - best `sentences` sentences, in their original order
+    Handles any input length (max_tokens None: no map-reduce needed).
+    Can stream: stream() yields the summary sentence by sentence.
+    """
+
+    name = "local"
+    max_tokens = None
+
+    def __init__(self, sentences=LOCAL_SENTENCES, damping=0.85, iterations=50):
+        if np is None:
+            raise RuntimeError('SUMMARIZER_BACKEND = "local" needs NumPy (pip install numpy)')
+        self.sentences = sentences
+        self.damping = damping
+        self.iterations = iterations
+
+    def summarize(self, text):
+        return " ".join(self.stream(text))
+
+    def stream(self, text):
+        """Summary sentences, one at a time."""
+        sentences = split_sentences(text)
+        if len(sentences) <= self.sentences:
+            yield from sentences
+            return
+
+        scores = self.rank(sentences)
+        for i in np.sort(np.argsort(-scores, kind="stable")[:self.sentences]):
+            yield sentences[i]
+
+    def rank(self, sentences):
+        """TextRank score of every sentence."""
+        # Term ids per sentence (stop words dropped)
+        vocab = {}
+        rows, cols = [], []
+        for row, sentence in enumerate(sentences):
+            for word in WORD.findall(sentence.lower()):
+                if word not in STOP_WORDS:
+                    rows.append(row)
+                    cols.append(vocab.setdefault(word, len(vocab)))
+
+        n = len(sentences)
+        if not vocab:
+            return np.zeros(n)
+
+        # Term frequencies → TF-IDF, one L2-normalized row per sentence
+        tf = np.zeros((n, len(vocab)))
+        np.add.at(tf, (rows, cols), 1.0)
+        df = np.count_nonzero(tf, axis=0)
+        tfidf = tf * (np.log((1 + n) / (1 + df)) + 1)
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+        tfidf /= np.where(norms == 0, 1, norms)
+
+        # Cosine similarity graph, rows normalized into transition weights
+        sim = tfidf @ tfidf.T
+        np.fill_diagonal(sim, 0)
+        out = sim.sum(axis=1, keepdims=True)
+        transition = np.divide(sim, out, out=np.full_like(sim, 1 / n), where=out > 0)
+
+        # PageRank
+        scores = np.full(n, 1 / n)
+        for _ in range(self.iterations):
+            updated = (1 - self.damping) / n + self.damping * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < 1e-6:
+                return updated
+            scores = updated
+        return scores
+
+
+WORD = re.compile(r"[a-z0-9']+")
+STOP_WORDS = frozenset("""
+    a an and are as at be been but by for from has have he her his i in is it its
+    of on or our she so that the their them they this to was we were which who
+    will with you your not no do does did can could would should than then there
+""".split())
+
+BACKENDS = {"remote": RemoteSummarizer, "local": LocalSummarizer}
+
+
+def make_backend(name=None):
+    """Build the summarizer backend selected by SUMMARIZER_BACKEND."""
+    name = name or SUMMARIZER_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend: {name}")
+    return BACKENDS[name]()
+
+
+summarizer = make_backend()
+
+# ===============================
+# Long Documents (map-reduce)
+# ===============================
+
+# Sentence ends: . ! ? (plus closing quotes/brackets) followed by space, or blank lines
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n")
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Chunks of all long documents share one bounded pool
+_chunk_pool = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="summarize-chunk")
+
+
+def count_tokens(text):
+    """
+    Rough model token count: words and punctuation marks,
+    plus a third for subword splits (t5 tokenizer). Rounded up, so
+    the counts of sentences packed together never undershoot.
+    """
+    return -(-len(TOKEN.findall(text)) * 4 // 3)
+
+
+def split_sentences(text):
+    """Split text into sentences (keeps their punctuation)."""
+    return [s.strip() for s in SENTENCE_END.split(text) if s and s.strip()]
+
+
+def chunk_text(text, max_tokens=None):
+    """
+    Pack whole sentences into chunks of at most max_tokens (CHUNK_TOKENS).
+    A sentence longer than that on its own is cut at word boundaries.
+    """
+    max_tokens = max_tokens or CHUNK_TOKENS
+    chunks, current, size = [], [], 0
+
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+
+        if tokens > max_tokens:
+            words = sentence.split()
+            step = max(1, len(words) * max_tokens // tokens)
+            pieces = [" ".join(words[i:i + step]) for i in range(0, len(words), step)]
+        else:
+            pieces = [sentence]
+
+        for piece in pieces:
+            piece_tokens = count_tokens(piece)
+            if current and size + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += piece_tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def summarize_long(text, progress=None):
+    """
+    Map-reduce summary of a text longer than the model input:
+    - split: sentence-aware chunks of up to CHUNK_TOKENS
+    - map: chunks summarized concurrently (CHUNK_WORKERS), each saved
+      by its own hash in the chunk table (up to CHUNK_MAX_ENTRIES, not
+      subject to CACHE_TTL), so an edited document only re-summarizes
+      the chunks that changed
+    - reduce: chunk summaries are joined and summarized again, level by
+      level, until they fit in one chunk
+    progress(part) gets every map-stage chunk summary as soon as it's
+    done (chunks finish out of order; "index" gives the position).
+    Returns (summary, details) with chunk counts and stage timings.
+    """
+    details = {"chunks": 0, "chunks_cached": 0, "levels": 0, "timings": {}}
+    timings = details["timings"]
+    start = time()
+
+    chunks = chunk_text(text)
+    timings["split"] = round(time() - start, 4)
+    observe_stage("split", time() - start)
+
+    level = 0
+    while True:
+        phase = "map" if level == 0 else f"reduce_{level}"
+        phase_start = time()
+
+        futures = {_chunk_pool.submit(summarize_chunk, c, text_hash(c)): i for i, c in enumerate(chunks)}
+        if progress and level == 0:
+            for future in as_completed(futures):
+                if future.exception() is None:
+                    progress({"stage": phase, "index": futures[future], "total": len(chunks),
+                              "text": future.result()[0]})
+        results = [future.result() for future in futures]
+
+        timings[phase] = round(time() - phase_start, 4)
+        observe_stage("map" if level == 0 else "reduce", time() - phase_start)
+        details["chunks"] += len(chunks)
+        details["chunks_cached"] += sum(1 for _, cached in results if cached)
+        level += 1
+
+        summaries = [summary_text for summary_text, _ in results]
+        if len(summaries) == 1:
+            break
+
+        combined = " ".join(summaries)
+        # Last level: everything fits in one model input
+        chunks = [combined] if count_tokens(combined) <= CHUNK_TOKENS or level >= MAX_REDUCE_LEVELS else chunk_text(combined)
+
+    details["levels"] = level
+    timings["total"] = round(time() - start, 4)
+    return summaries[0], details
+
+# ===============================
+# Job Queue
+# ===============================
+
+class SummaryJobs:
+    """
+    Runs summarizations on a small worker pool.
+    Requests for a text already queued/running (same text_hash) join
+    that job instead of starting another one. Finished jobs are kept
+    (up to JOB_HISTORY) so clients can poll them.
+    Jobs live in this process only: with several server workers, a poll
+    may reach a worker that never saw the job (404). The page therefore
+    uses a single "stream": true request instead of async + polling.
+    """
+
+    def __init__(self, workers=SUMMARY_WORKERS, history=JOB_HISTORY):
+        self.workers = workers
+        self.history = history
+        self._cond = threading.Condition()
+        self._jobs = OrderedDict()   # job_id → job
+        self._active = {}            # text hash → job_id
+        self._pool = None
+        self._pid = None
+
+    def _executor(self):
+        # Created on first use (and again after a fork)
+        if self._pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="summarize")
+            self._pid = os.getpid()
+        return self._pool
+
+    def submit(self, text, hash_id):
+        """Queue a summary, or join the job already running for this text."""
+        with self._cond:
+            if hash_id in self._active:
+                job = self._jobs[self._active[hash_id]]
+                job["requests"] += 1
+                return self._public(job)
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "hash": hash_id,
+                "status": "queued",
+                "requests": 1,
+                "summary": None,
+                "cached": False,
+                "error": None,
+                "error_status": None,
+                "details": None,
+                "partials": [],
+                "timings": {},
+                "created_at": time(),
+                "finished_at": None,
+                "version": 0,
+            }
+            self._jobs[job["id"]] = job
+            self._active[hash_id] = job["id"]
+            self._trim()
+            executor = self._executor()
+
+        executor.submit(self._run, job, text)
+        return self._public(job)
+
+    def _trim(self):
+        # Drop the oldest finished jobs beyond the history size
+        finished = [jid for jid, j in self._jobs.items() if j["status"] in ("done", "failed")]
+        for jid in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[jid]
 
-    for key, value in TEMP_CACHE.items():
-        if now - value["timestamp"] > CACHE_TTL:
-            expired_keys.append(key)
+    def _update(self, job, **fields):
+        with self._cond:
+            job.update(fields)
+            job["version"] += 1
+            if job["status"] in ("done", "failed"):
+                self._active.pop(job["hash"], None)
+            self._cond.notify_all()
 
-    for key in expired_keys:
-        del TEMP_CACHE[key]
+    def _run(self, job, text):
+        observe_stage("queue_wait", time() - job["created_at"])
+        self._update(job, status="running")
+
+        def progress(part):
+            # A new list each time, so copies handed out stay unchanged
+            self._update(job, partials=job["partials"] + [part])
+
+        def finish(**fields):
+            # Stage timings of this job go along, for profiled requests waiting on it
+            self._update(job, finished_at=time(), timings=_profile.timings, **fields)
+
+        _profile.timings = {}
+        try:
+            summary_text, details = generate_summary(text, job["hash"], progress)
+            if NEAR_DUP_MODE:
+                near_duplicates.add(text, job["hash"])
+            finish(status="done", summary=summary_text, cached=False, details=details)
+        except SummaryError as e:
+            finish(status="failed", error=str(e), error_status=e.status)
+        except Exception:
+            app.logger.exception("summary job %s failed", job["id"])
+            finish(status="failed", error="Summarization failed", error_status=500)
+        finally:
+            _profile.timings = None
+
+    def _public(self, job):
+        return {k: v for k, v in job.items() if k not in ("error_status", "timings")}
+
+    def get(self, job_id):
+        """Copy of a job, or None if unknown."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id, version=-1, timeout=None):
+        """
+        Block until the job changes past `version` (or finishes).
+        Returns a copy of the job (unchanged on timeout), None if unknown.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]["version"] > version,
+                timeout
+            )
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_done(self, job_id, timeout=None):
+        """Block until the job is done or failed (or the timeout passes)."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]["status"] in ("done", "failed"),
+                timeout
+            )
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+summary_jobs = SummaryJobs()
+
+
+def partial_text(partials):
+    """Partial output received so far, in document order."""
+    return " ".join(part["text"] for part in sorted(partials, key=lambda p: p["index"]))
+
+
+def job_response(job):
+    """Public JSON view of a job."""
+    data = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "hash": job["hash"],
+        "merged": job["requests"] > 1,
+    }
+    if job["status"] == "running" and job["partials"]:
+        data["partial"] = partial_text(job["partials"])
+    if job["status"] == "done":
+        data["summary"] = job["summary"]
+        data["cached"] = job["cached"]
+        if job["details"]:
+            data["long_document"] = job["details"]
+    if job["status"] == "failed":
+        data["error"] = job["error"]
+    return data
+
+# ===============================
+# Bulk Summarization
+# ===============================
+
+def _jsonl_documents(lines, prefix=None):
+    """Documents from JSONL lines: {"id": ..., "text": ...} objects or plain strings."""
+    for n, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        default_id = f"{prefix}:{n}" if prefix else n
+
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield {"id": default_id, "error": "Invalid JSON"}
+            continue
+
+        if isinstance(item, dict):
+            yield {"id": item.get("id", default_id), "text": item.get("text")}
+        else:
+            yield {"id": default_id, "text": item}
+
+
+def read_documents(f):
+    """
+    Documents from a seekable binary file:
+    - zip archive → each member one document (id = file name),
+      except .jsonl members, read line by line
+    - anything else → JSONL, one document per line (id = line number
+      unless given)
+    Yields {"id", "text"}, or {"id", "error"} for unreadable entries.
+    """
+    if zipfile.is_zipfile(f):
+        f.seek(0)
+        with zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.file_size > BULK_MAX_DOC_BYTES:
+                    yield {"id": info.filename, "error": "Document too large"}
+                    continue
+
+                data = archive.read(info).decode("utf-8", "replace")
+                if info.filename.endswith(".jsonl"):
+                    yield from _jsonl_documents(data.splitlines(), prefix=info.filename)
+                else:
+                    yield {"id": info.filename, "text": data}
+        return
+
+    f.seek(0)
+    yield from _jsonl_documents(io.TextIOWrapper(f, encoding="utf-8", errors="replace"))
+
+
+def _bulk_one(text, hash_id):
+    """One unique document through the same cache → backend pipeline as /summarize."""
+    hit = find_cached(text, hash_id, scope="bulk")
+    if hit:
+        return hit[0], hit[1]
+
+    summary_text, _ = generate_summary(text, hash_id)
+    if NEAR_DUP_MODE:
+        near_duplicates.add(text, hash_id)
+    return summary_text, False
+
+
+def bulk_summarize(documents, workers=BULK_WORKERS, save=True):
+    """
+    Summarize many documents, yielding one result per document as soon as
+    it is done (not in input order), then {"report": {...}}.
+    - at most `workers` documents summarized at once, and only 2 × workers
+      read ahead of the results, so any input size runs in bounded memory
+    - documents with the same text_hash are summarized once; repeats get
+      the same result with "duplicate": true
+    - with save, summaries go to the store BULK_STORE_BATCH at a time
+    Results: {"id", "hash", "summary", "cached"} or {"id", "error"}.
+    """
+    start = time()
+    counts = {"docs": 0, "unique": 0, "duplicates": 0, "cached": 0, "failed": 0, "saved": 0}
+    seen = {}        # text hash → finished result, or ids of repeats waiting for it
+    pending = {}     # future → (doc id, text hash)
+    to_store = []
+
+    def flush():
+        if to_store:
+            counts["saved"] += store_summaries(to_store)
+            to_store.clear()
+
+    def finish(future):
+        doc_id, hash_id = pending.pop(future)
+        try:
+            summary_text, cached = future.result()
+            result = {"hash": hash_id, "summary": summary_text, "cached": cached}
+            counts["cached"] += bool(cached)
+            if save:
+                to_store.append((hash_id, summary_text))
+                if len(to_store) >= BULK_STORE_BATCH:
+                    flush()
+        except SummaryError as e:
+            result = {"hash": hash_id, "error": str(e)}
+        except Exception:
+            app.logger.exception("bulk summary of %s failed", doc_id)
+            result = {"hash": hash_id, "error": "Summarization failed"}
+
+        waiting, seen[hash_id] = seen[hash_id], result
+        counts["failed"] += ("error" in result) * (1 + len(waiting))
+        yield {"id": doc_id, **result}
+        for repeat_id in waiting:
+            yield {"id": repeat_id, **result, "duplicate": True}
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarize-bulk") as pool:
+        for doc in documents:
+            counts["docs"] += 1
+            text = doc.get("text")
+            error = doc.get("error")
+            if not error and (not isinstance(text, str) or not text.strip()):
+                error = "No text provided"
+            elif not error and len(text) > MAX_TEXT_CHARS:
+                error = f"Text longer than {MAX_TEXT_CHARS} characters"
+            if error:
+                counts["failed"] += 1
+                yield {"id": doc["id"], "error": error}
+                continue
+
+            hash_id = text_hash(text)
+            if hash_id in seen:
+                counts["duplicates"] += 1
+                if isinstance(seen[hash_id], list):
+                    seen[hash_id].append(doc["id"])
+                else:
+                    counts["failed"] += "error" in seen[hash_id]
+                    yield {"id": doc["id"], **seen[hash_id], "duplicate": True}
+                continue
+
+            counts["unique"] += 1
+            seen[hash_id] = []
+            pending[pool.submit(_bulk_one, text, hash_id)] = (doc["id"], hash_id)
+
+            # Bounded read-ahead: wait for results before reading more
+            while len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from finish(future)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from finish(future)
+
+    flush()
+    elapsed = time() - start
+    yield {"report": {
+        **counts,
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(counts["docs"] / elapsed, 1) if elapsed else None,
+        "cache_hit_rate": round(counts["cached"] / counts["unique"], 3) if counts["unique"] else None,
+    }}
 
 # ===============================
 # Routes
 # ===============================
 
+@app.before_request
+def start_request_timer():
+    request.started_at = perf_counter()
+    # Opt-in timing breakdown of this request (see add_server_timing)
+    _profile.timings = {} if request.headers.get(PROFILE_HEADER) else None
+
+
+def add_profile(timings):
+    """Merge stage timings from another thread (a job) into this request's profile."""
+    if timings and getattr(_profile, "timings", None) is not None:
+        for name, seconds in timings.items():
+            _profile.timings[f"job_{name}"] = _profile.timings.get(f"job_{name}", 0) + seconds
+
+
+@app.after_request
+def add_server_timing(response):
+    """
+    Record request latency; with the PROFILE_HEADER request header, list
+    stage timings in a Server-Timing header (ms; job_* stages ran on the
+    worker the request waited for).
+    """
+    elapsed = perf_counter() - getattr(request, "started_at", perf_counter())
+    HTTP_SECONDS.observe(elapsed, endpoint=request.endpoint or "unknown", status=response.status_code)
+
+    timings = getattr(_profile, "timings", None)
+    if timings is not None:
+        timings["total"] = elapsed
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()
+        )
+    _profile.timings = None
+    return response
+
+
 @app.route("/")
 def index():
     """Render homepage."""
     return render_template("index.html")
 
 
+def library_args():
+    """Search, sort and cursor of a library request."""
+    query = request.args.get("q", "").strip()
+    sort = "oldest" if request.args.get("sort") == "oldest" else "newest"
+    return query, sort, request.args.get("after") or None
+
+
 @app.route("/library")
 def show_library():
     """
-    Display saved summaries from persistent storage.
+    Display saved summaries, first page (more load on scroll).
+    - ?q=text → only summaries matching the search
+    - ?sort=newest|oldest → order by created_at
+    - ?after=cursor → start after that summary (no-JS "Load more")
+    """
+    query, sort, after = library_args()
+    summaries, next_after = list_summaries(after, sort, query)
+
+    return render_template("library.html", summaries=summaries, next_after=next_after, query=query, sort=sort)
+
+
+@app.route("/library/summaries")
+def library_summaries():
+    """
+    Library API for infinite scroll (JSON).
+    - ?q, ?sort, ?after → as for /library
+    - ?limit=n → page size (max LIBRARY_PAGE_MAX)
     """
-    json_path = os.path.join(current_app.instance_path, "summaries.json")
+    query, sort, after = library_args()
+    limit = min(max(request.args.get("limit", LIBRARY_PAGE_SIZE, type=int), 1), LIBRARY_PAGE_MAX)
+    summaries, next_after = list_summaries(after, sort, query, limit)
 
-    # If no summaries exist yet
-    if not os.path.exists(json_path):
-        return render_template("save.html", data=[])
+    return {"summaries": summaries, "next_after": next_after}
 
-    with open(json_path, "r") as f:
-        data = json.load(f)
 
-    return render_template("library.html", summaries=data)
+def cache_hit_response(data):
+    """A cached summary: JSON, or a single "done" event in streaming mode."""
+    if request.json.get("stream"):
+        return event_stream_response(iter([sse("done", {"status": "done", **data})]))
+    return data
 
 
 @app.route("/summarize", methods=["POST"])
@@ -96,115 +1904,188 @@ def summarize():
     """
     Generate or retrieve a summary for provided text.
     Cache lookup order:
-    1. In-memory cache
-    2. Disk-based JSON storage
-    3. Hugging Face API
-    """
-    cleanup_cache()
+    1. Temporary cache (TEMP_CACHE)
+    2. Saved summaries (SQLite)
+    3. Same text after normalization, or a near duplicate (NearDuplicateIndex)
+    4. Summarizer backend (through the job queue)
 
+    With "async": true a cache miss answers 202 with a job id right away;
+    poll /jobs/<job_id> or stream /jobs/<job_id>/events for the result.
+    With "stream": true the response itself is that event stream
+    (partial output as it is produced, then "done"); cache hits send
+    "done" right away. Otherwise the request waits for the job to finish.
+    """
     text = request.json.get("text")
     if not text:
         return {"error": "No text provided"}, 400
+    if len(text) > MAX_TEXT_CHARS:
+        return {"error": f"Text longer than {MAX_TEXT_CHARS} characters"}, 413
+    TEXT_BYTES.observe(len(text.encode("utf-8")))
 
     hash_id = text_hash(text)
 
-    # 1. In-memory cache
-    if hash_id in TEMP_CACHE:
-        return {
-            "summary": TEMP_CACHE[hash_id]["summary"],
-            "cached": "memory",
+    # 1-3. Cache, saved summaries, normalized / near-duplicate match
+    hit = find_cached(text, hash_id)
+    if hit:
+        summary_text, cached, near = hit
+        data = {
+            "summary": summary_text,
+            "cached": cached,
             "hash": hash_id
         }
+        if near:
+            data["near_duplicate"] = near
+        return cache_hit_response(data)
 
-    json_path = os.path.join(current_app.instance_path, "summaries.json")
+    # 4. Summarizer call (merged with any job for the same text)
+    job = summary_jobs.submit(text, hash_id)
 
-    # 2. Persistent JSON cache
-    if os.path.exists(json_path):
-        with open(json_path, "r") as f:
-            data = json.load(f)
-    else:
-        data = []
+    if request.json.get("stream"):
+        return event_stream_response(job_event_stream(job["id"]))
 
-    for item in data:
-        if item.get("hash") == hash_id:
-            TEMP_CACHE[hash_id] = {
-                "summary": item["summary"],
-                "timestamp": time()
-            }
-            return {
-                "summary": item["summary"],
-                "cached": "disk",
-                "hash": hash_id
-            }
+    if request.json.get("async"):
+        return job_response(job), 202, {"Location": url_for("job_status", job_id=job["id"])}
 
-    # 3. External API call
-    payload = {
-        "inputs": f"summarize: {text}",
-        "parameters": {
-            "max_length": 120,
-            "min_length": 30
-        }
+    with stage("wait"):
+        job = summary_jobs.wait_done(job["id"], timeout=JOB_TIMEOUT)
+    add_profile(job["timings"] if job else None)
+
+    if job is None or job["status"] not in ("done", "failed"):
+        return {"error": "API request timed out"}, 504
+    if job["status"] == "failed":
+        return {"error": job["error"]}, job["error_status"] or 500
+
+    data = {
+        "summary": job["summary"],
+        "cached": job["cached"],
+        "hash": hash_id
     }
+    if job["details"]:
+        data["long_document"] = job["details"]
+    return data
 
-    response = requests.post(API_URL, headers=headers, json=payload)
 
-    if response.status_code != 200:
-        return {"error": "API request failed"}, 500
+@app.route("/bulk", methods=["POST"])
+def bulk():
+    """
+    Summarize a batch of documents (see bulk_summarize).
+    Body: a JSONL or zip file, as a "file" upload or the raw request body.
+    - ?save=false → don't write the summaries to the library
+    Streams results back as JSONL while they finish; the last line is
+    {"report": {...}} with docs/sec and the cache hit rate.
+    """
+    upload = request.files.get("file")
+    save = request.args.get("save", "true").lower() != "false"
 
-    result = response.json()
-    summary_text = result[0]["translation_text"]
+    # Spool the input to a temp file: it outlives the request while results
+    # stream, and zip archives need seeking
+    f = tempfile.TemporaryFile()
+    shutil.copyfileobj(upload.stream if upload else request.stream, f)
 
-    # Store result in temporary cache
-    TEMP_CACHE[hash_id] = {
-        "summary": summary_text,
-        "timestamp": time()
-    }
+    def stream():
+        with f:
+            for result in bulk_summarize(read_documents(f), save=save):
+                yield json.dumps(result) + "\n"
 
-    return {
-        "summary": summary_text,
-        "cached": False,
-        "hash": hash_id
-    }
+    return Response(stream(), mimetype="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
 
 
-@app.route("/save", methods=["POST"])
-def save_file():
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Status of a summary job (JSON); includes the summary once done."""
+    job = summary_jobs.get(job_id)
+    if not job:
+        return {"error": "Unknown job"}, 404
+    return job_response(job)
+
+
+def sse(event, data):
+    """One Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def job_event_stream(job_id):
     """
-    Persist a summary to disk if not already saved.
+    Server-Sent Events of a summary job:
+    - "status" when its status changes (queued → running)
+    - "partial" for every piece of partial output
+      ({"stage", "index", "total", "text"})
+    - "done" or "failed" at the end
     """
-    summary_text = request.json.get("summary")
-    hash_id = request.json.get("hash")
+    version, status, sent = -1, None, 0
+    while True:
+        job = summary_jobs.wait(job_id, version, timeout=SSE_KEEPALIVE)
+        if job is None:
+            return
+        if job["version"] == version:
+            yield ": keep-alive\n\n"
+            continue
 
-    if not summary_text and not hash:
-        return {"status": "error"}, 400
+        version = job["version"]
+        if job["status"] != status and job["status"] not in ("done", "failed"):
+            status = job["status"]
+            yield sse("status", job_response(job))
 
-    json_path = os.path.join(current_app.instance_path, "summaries.json")
+        for part in job["partials"][sent:]:
+            yield sse("partial", part)
+        sent = len(job["partials"])
 
-    # Ensure file exists
-    if not os.path.exists(json_path):
-        with open(json_path, "w") as f:
-            json.dump([], f)
+        if job["status"] in ("done", "failed"):
+            yield sse(job["status"], job_response(job))
+            return
 
-    with open(json_path, "r") as f:
-        data = json.load(f)
 
-    # Avoid duplicate saves
-    for item in data:
-        if item.get("hash") == hash_id:
-            return {"status": "success"}, 200
+def event_stream_response(events):
+    return Response(events, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
-    new_entry = {
-        "id": str(uuid.uuid4()),
-        "hash": hash_id,
-        "summary": summary_text,
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")
-    }
 
-    data.append(new_entry)
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """Stream a summary job as Server-Sent Events (see job_event_stream)."""
+    if not summary_jobs.get(job_id):
+        return {"error": "Unknown job"}, 404
+
+    return event_stream_response(job_event_stream(job_id))
+
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus metrics (text format): stage latencies, cache tiers, upstream calls, sizes."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/stats/cache")
+def cache_stats():
+    """Summary cache usage (JSON): entries, bytes, hits, misses, evictions."""
+    return TEMP_CACHE.status()
+
+
+@app.route("/stats/batches")
+def batch_stats():
+    """Micro-batching usage (JSON): batches sent, average and largest size."""
+    return api_batcher.status()
+
+
+@app.route("/stats/duplicates")
+def duplicate_stats():
+    """Near-duplicate matching (JSON): hit rates, LSH candidates, rejected matches."""
+    return near_duplicates.status()
+
 
-    with open(json_path, "w") as f:
-        json.dump(data, f, indent=2)
+@app.route("/save", methods=["POST"])
+def save_file():
+    """
+    Persist a summary to disk if not already saved.
+    """
+    summary_text = request.json.get("summary")
+    hash_id = request.json.get("hash")
 
+    if not summary_text or not hash_id:
+        return {"status": "error"}, 400
+
+    # Duplicate saves are ignored by the unique hash index
+    store_summary(hash_id, summary_text)
     return {"status": "success"}, 200
 
 
@@ -213,21 +2094,42 @@ def delete_summary(summary_id):
     """
     Delete a saved summary by its ID.
     """
-    json_path = os.path.join(current_app.instance_path, "summaries.json")
-
-    if not os.path.exists(json_path):
+    if not remove_summary(summary_id):
         return {"status": "error"}, 400
 
-    with open(json_path, "r") as f:
-        data = json.load(f)
+    return {"status": "success"}, 200
 
-    # Filter out deleted summary
-    data = [s for s in data if s["id"] != summary_id]
 
-    with open(json_path, "w") as f:
-        json.dump(data, f, indent=2)
+@app.cli.command("migrate-json")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False), required=False)
+def migrate_json_command(path):
+    """Import a summaries.json file (default: the instance one) into the database."""
+    path = path or summaries_path()
+    if not os.path.exists(path):
+        click.echo("Nothing to migrate.")
+        return
+    click.echo(f"Imported {migrate_json(path)} summaries from {path}.")
 
-    return {"status": "success"}, 200
+
+@app.cli.command("summarize-bulk")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("-o", "--output", type=click.File("w"), default="-", help="Results file (JSONL, default stdout).")
+@click.option("--workers", default=BULK_WORKERS, show_default=True, help="Documents summarized at once.")
+@click.option("--no-save", is_flag=True, help="Don't write the summaries to the library.")
+def summarize_bulk_command(path, output, workers, no_save):
+    """Summarize a JSONL or zip file of documents, writing results as JSONL."""
+    with open(path, "rb") as f:
+        for result in bulk_summarize(read_documents(f), workers, save=not no_save):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    report = result["report"]
+    click.echo(
+        f"{report['docs']} documents ({report['duplicates']} duplicates, {report['failed']} failed) "
+        f"in {report['seconds']}s: {report['docs_per_sec']} docs/s, "
+        f"cache hit rate {report['cache_hit_rate']}, {report['saved']} saved.",
+        err=True
+    )
 
 
 # ===============================
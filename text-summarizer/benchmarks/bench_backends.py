@@ -0,0 +1,80 @@
+"""
+Compare the summarizer backends: local (extractive, NumPy) vs remote.
+
+Summarizes --docs distinct documents of --words words through
+summarizer.summarize(), once one at a time and once from --clients
+threads. The remote backend talks to a local mock inference server
+(50 ms per request + 5 ms per input, 2 requests at a time), so its
+numbers are a floor for the real API. Each document is one backend
+call (keep --words under CHUNK_TOKENS for a fair remote comparison;
+longer texts go through map-reduce in the app).
+
+Run from the text-summarizer folder:
+    python benchmarks/bench_backends.py [--docs 64] [--words 300] [--clients 16]
+"""
+import time
+import random
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from common import load_app, MockInference
+
+# A 2000-word vocabulary, so sentences overlap like real prose does
+WORDS = [f"word{i}" for i in range(2000)]
+
+
+def make_doc(n, words, rng):
+    """Synthetic prose: sentences of 8-20 words."""
+    out, left = [], words
+    while left > 0:
+        size = min(left, rng.randint(8, 20))
+        sentence = " ".join(rng.choice(WORDS) for _ in range(size))
+        out.append(f"Doc {n} {sentence}.")
+        left -= size
+    return " ".join(out)
+
+
+def run(backend, docs, clients):
+    """Latencies (s) of summarizing every doc, and total wall time."""
+    def one(doc):
+        start = time.perf_counter()
+        backend.summarize(doc)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = sorted(pool.map(one, docs))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=64)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--clients", type=int, default=16)
+    args = parser.parse_args()
+
+    app = load_app()
+    mock = MockInference().start()
+    app.API_URL = mock.url
+
+    rng = random.Random(1)
+    docs = [make_doc(n, args.words, rng) for n in range(args.docs)]
+    backends = [app.make_backend("local"), app.make_backend("remote")]
+
+    print(f"{args.docs} docs × {args.words} words\n")
+    print(f"{'backend':>8} {'clients':>8} {'docs/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+
+    for backend in backends:
+        for clients in (1, args.clients):
+            latencies, elapsed = run(backend, docs, clients)
+            p50 = statistics.median(latencies) * 1000
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+            print(f"{backend.name:>8} {clients:>8} {len(docs) / elapsed:>8.1f} {p50:>9.1f} {p95:>9.1f}")
+
+    mock.stop()
+
+
+if __name__ == "__main__":
+    main()
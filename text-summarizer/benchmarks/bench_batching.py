@@ -0,0 +1,68 @@
+"""
+Load-test micro-batching of Hugging Face API calls.
+
+--clients threads each summarize --texts distinct texts through
+call_summary_api(), against a local mock inference server that costs
+50 ms per request + 5 ms per input and runs 2 requests at a time.
+Compares batch windows (0 = one request per text).
+
+Run from the text-summarizer folder:
+    python benchmarks/bench_batching.py [--clients 32] [--texts 10]
+"""
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from common import load_app, MockInference
+
+WINDOWS_MS = [0, 5, 20, 50]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--texts", type=int, default=10)
+    parser.add_argument("--max-items", type=int, default=8)
+    args = parser.parse_args()
+
+    app = load_app()
+    mock = MockInference().start()
+    app.API_URL = mock.url
+
+    print(f"{args.clients} clients × {args.texts} texts, batches of up to {args.max_items}\n")
+    print(f"{'window (ms)':>11} {'texts/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'requests':>9} {'avg batch':>10}")
+
+    for window in WINDOWS_MS:
+        app.BATCH_WINDOW_MS = window
+        app.api_batcher = app.MicroBatcher(app.post_inputs, window / 1000, args.max_items, app.BATCH_SENDERS)
+        mock.requests = 0
+
+        def client(n):
+            latencies = []
+            for i in range(args.texts):
+                text = f"Client {n} text {i}: " + "lorem ipsum dolor sit amet " * 20
+                start = time.perf_counter()
+                app.call_summary_api(text)
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = [t for result in pool.map(client, range(args.clients)) for t in result]
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        avg_batch = len(latencies) / mock.requests
+        print(f"{window:>11} {len(latencies) / elapsed:>8.1f} {p50:>9.1f} {p95:>9.1f} "
+              f"{mock.requests:>9} {avg_batch:>10.2f}")
+
+    mock.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Bulk summarization throughput.
+
+Runs bulk_summarize() over --docs synthetic documents (--dup-rate of
+them repeats of earlier ones) with several worker counts, against the
+local mock inference server (50 ms per request + 5 ms per input, 2
+requests at a time). Each run starts with an empty cache; a final run
+repeats the corpus to show the all-cached case.
+
+Run from the text-summarizer folder:
+    python benchmarks/bench_bulk.py [--docs 400] [--dup-rate 0.2]
+"""
+import random
+import argparse
+
+from common import load_app, MockInference
+
+WORKERS = [1, 4, 8, 16]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    app = load_app()
+    mock = MockInference().start()
+    app.API_URL = mock.url
+
+    print(f"{args.docs} docs, {args.dup_rate:.0%} duplicates\n")
+    print(f"{'workers':>8} {'docs/s':>8} {'cache hits':>11} {'duplicates':>11} {'API requests':>13}")
+
+    def run(workers, seed, label=None):
+        rng = random.Random(seed)
+        texts = []
+        for i in range(args.docs):
+            if texts and rng.random() < args.dup_rate:
+                texts.append(rng.choice(texts))
+            else:
+                texts.append(" ".join(f"word{rng.randrange(5000)}" for _ in range(60)) + f" doc {seed}-{i}.")
+
+        mock.requests = 0
+        for result in app.bulk_summarize(({"id": i, "text": t} for i, t in enumerate(texts)), workers, save=False):
+            pass
+        report = result["report"]
+        print(f"{label or workers:>8} {report['docs_per_sec']:>8.1f} {report['cache_hit_rate']:>11.0%} "
+              f"{report['duplicates']:>11} {mock.requests:>13}")
+
+    for seed, workers in enumerate(WORKERS):
+        run(workers, seed)
+    run(WORKERS[-1], len(WORKERS) - 1, label="repeat")
+
+    mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Tune near-duplicate matching of /summarize cache lookups.
+
+Indexes --docs synthetic documents, then looks up edited copies of them
+(whitespace/punctuation/case changes, and word substitutions at several
+edit rates) plus unrelated documents. Since the source of every query is
+known, true hits and false matches are counted exactly, per threshold.
+
+Run from the text-summarizer folder:
+    python benchmarks/bench_duplicates.py [--docs 2000] [--words 300]
+"""
+import time
+import random
+import argparse
+
+from common import load_app
+
+THRESHOLDS = [0.7, 0.8, 0.9, 0.95]
+EDIT_RATES = [0.0, 0.01, 0.02, 0.05, 0.1, 0.2]
+
+
+def make_doc(rng, words):
+    return [f"word{rng.randrange(5000)}" for _ in range(words)]
+
+
+def edit(rng, words, rate):
+    """Swap `rate` of the words, then add cosmetic noise (case, spacing, punctuation)."""
+    words = list(words)
+    for i in rng.sample(range(len(words)), int(len(words) * rate)):
+        words[i] = f"edit{rng.randrange(10 ** 6)}"
+    return "  ".join(w.upper() if rng.random() < 0.1 else w for w in words) + " !!"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200, help="queries per edit rate")
+    args = parser.parse_args()
+
+    app = load_app()
+    rng = random.Random(1)
+    docs = [make_doc(rng, args.words) for _ in range(args.docs)]
+    hashes = [app.text_hash(" ".join(d)) for d in docs]
+    source = {h: i for i, h in enumerate(hashes)}
+
+    queries = []   # (edit rate or None for unrelated, expected doc index, text)
+    for rate in EDIT_RATES:
+        for _ in range(args.queries):
+            i = rng.randrange(args.docs)
+            queries.append((rate, i, edit(rng, docs[i], rate)))
+    for _ in range(args.queries):
+        queries.append((None, None, " ".join(make_doc(rng, args.words))))
+
+    print(f"{args.docs} docs × {args.words} words, {args.queries} queries per edit rate\n")
+    header = " ".join(f"{f'{r:.0%}':>6}" for r in EDIT_RATES)
+    print(f"{'':>33}hit rate per edit rate")
+    print(f"{'threshold':>9} {'index (s)':>9} {'lookup (ms)':>11} | {header} | {'false':>5}")
+
+    for threshold in THRESHOLDS:
+        index = app.NearDuplicateIndex(threshold, app.NEAR_DUP_BANDS, args.docs, app.NEAR_DUP_MIN_WORDS)
+        start = time.perf_counter()
+        for doc, h in zip(docs, hashes):
+            index.add(" ".join(doc), h)
+        index_time = time.perf_counter() - start
+
+        hits = {rate: 0 for rate in EDIT_RATES}
+        false = 0
+        start = time.perf_counter()
+        for rate, expected, text in queries:
+            match = index.find(text, lambda h: ("summary", "memory"))
+            if match is None:
+                continue
+            if rate is None or source[match[2]["hash"]] != expected:
+                false += 1
+            else:
+                hits[rate] += 1
+        lookup_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        rates = " ".join(f"{hits[r] / args.queries:>6.0%}" for r in EDIT_RATES)
+        print(f"{threshold:>9} {index_time:>9.2f} {lookup_ms:>11.2f} | {rates} | {false:>5}")
+
+    status = index.status()
+    print(f"\nLSH candidates per lookup: {status['candidates'] / status['lookups']:.2f}, "
+          f"rejected by the similarity check: {status['false_candidate_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
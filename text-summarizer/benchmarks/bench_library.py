@@ -0,0 +1,85 @@
+"""
+Library page latency on a large synthetic store.
+
+Fills a fresh summaries.db with --rows saved summaries, then times
+fetching pages at increasing depth: the old OFFSET query vs the keyset
+cursor of list_summaries(), plus text searches through the FTS index.
+
+Run from the text-summarizer folder:
+    python benchmarks/bench_library.py [--rows 100000]
+"""
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from common import load_app
+
+# 5000-word vocabulary (each word in ~1% of summaries), plus "report" in every other one
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+def timed(fn, repeat=20):
+    """Median milliseconds of fn()."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    app = load_app()
+    conn = app.get_db()
+    rng = random.Random(1)
+    start_date = datetime(2024, 1, 1)
+
+    start = time.perf_counter()
+    with conn:
+        conn.executemany(
+            "INSERT INTO summary (id, hash, summary, created_at) VALUES (?, ?, ?, ?);",
+            ((str(uuid.uuid4()), f"{i:064x}", " ".join(rng.choice(WORDS) for _ in range(40)) + (" report" if i % 2 else ""),
+              (start_date + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M"))
+             for i in range(args.rows))
+        )
+    print(f"{args.rows} summaries stored in {time.perf_counter() - start:.1f}s\n")
+
+    per_page = app.LIBRARY_PAGE_SIZE
+
+    def offset_page(page):
+        return conn.execute("""
+            SELECT id, hash, summary, created_at FROM summary
+            ORDER BY created_at DESC, seq DESC
+            LIMIT ? OFFSET ?;
+        """, (per_page + 1, (page - 1) * per_page)).fetchall()
+
+    def cursor_at(page):
+        # Cursor of the row just before the page (what the client would hold)
+        row = conn.execute("""
+            SELECT seq, created_at FROM summary
+            ORDER BY created_at DESC, seq DESC LIMIT 1 OFFSET ?;
+        """, ((page - 1) * per_page - 1,)).fetchone()
+        return f"{row['created_at']}|{row['seq']}" if row else None
+
+    print(f"{'page':>6} {'OFFSET (ms)':>12} {'cursor (ms)':>12}")
+    for page in (1, 10, 100, 1000, args.rows // per_page):
+        after = cursor_at(page) if page > 1 else None
+        offset_ms = timed(lambda: offset_page(page))
+        cursor_ms = timed(lambda: app.list_summaries(after))
+        print(f"{page:>6} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+
+    print(f"\n{'search':>12} {'matches':>8} {'first page (ms)':>16}")
+    for query in ("word42", "word42 word7", "word12", "report", "nomatch"):
+        matches = conn.execute("SELECT count(*) FROM summary_fts WHERE summary_fts MATCH ?;",
+                               (app.fts_query(query),)).fetchone()[0]
+        print(f"{query:>12} {matches:>8} {timed(lambda: app.list_summaries(query=query)):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
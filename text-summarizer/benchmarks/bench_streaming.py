@@ -0,0 +1,56 @@
+"""
+Time to first output of streaming /summarize vs the full response.
+
+Posts documents of increasing length with "stream": true through the
+Flask test client and records when the first "partial" event and the
+final "done" event arrive. Remote backend against the local mock
+inference server (50 ms per request + 5 ms per input).
+
+Run from the text-summarizer folder:
+    python benchmarks/bench_streaming.py
+"""
+import time
+import random
+
+from common import load_app, MockInference
+
+SENTENCES = [20, 100, 200, 350]  # 350 ≈ MAX_TEXT_CHARS
+
+
+def make_doc(rng, sentences):
+    return " ".join(" ".join(f"word{rng.randrange(5000)}" for _ in range(15)) + "." for _ in range(sentences))
+
+
+def main():
+    app = load_app()
+    mock = MockInference().start()
+    app.API_URL = mock.url
+    client = app.app.test_client()
+    rng = random.Random(1)
+
+    print(f"{'tokens':>7} {'chunks':>7} {'first output (ms)':>18} {'done (ms)':>10}")
+
+    for sentences in SENTENCES:
+        text = make_doc(rng, sentences)
+        start = time.perf_counter()
+        first = done = None
+
+        response = client.post("/summarize", json={"text": text, "stream": True}, buffered=False)
+        for chunk in response.response:
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            now = time.perf_counter() - start
+            if first is None and "event: partial" in chunk:
+                first = now
+            if "event: done" in chunk:
+                done = now
+        response.close()
+
+        chunks = len(app.chunk_text(text)) if app.count_tokens(text) > app.CHUNK_TOKENS else 1
+        first_ms = f"{first * 1000:.0f}" if first is not None else "-"
+        print(f"{app.count_tokens(text):>7} {chunks:>7} {first_ms:>18} {done * 1000:>10.0f}")
+
+    mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Shared helpers for text-summarizer benchmarks:
+- a local mock of the Hugging Face inference endpoint
+- loading app.py against a throwaway instance folder
+"""
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+import importlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # many clients connect at once
+
+
+def load_app():
+    """
+    Import app.py with its instance folder (summaries.db, cache.db)
+    in a temp folder, pointed at no real API.
+    """
+    os.environ["SUMMARIZER_INSTANCE"] = tempfile.mkdtemp(prefix="ts-bench-")
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    return importlib.import_module("app")
+
+
+class MockInference:
+    """
+    Minimal stand-in for the Hugging Face inference API.
+    overhead:  seconds per request (network + queueing + model call)
+    per_item:  extra seconds per input in the request
+    slots:     requests processed at the same time (like one GPU);
+               the rest wait their turn
+
+    Accepts "inputs" as a string or a list; answers one
+    {"summary_text": ...} per input.
+    """
+
+    def __init__(self, overhead=0.05, per_item=0.005, slots=2):
+        self.overhead = overhead
+        self.per_item = per_item
+        self.requests = 0
+        self.items = 0
+        self.connections = 0
+        self._slots = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+        self.server = Server(("127.0.0.1", 0), self._handler())
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/models/t5-small"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def summarize(self, prompt):
+        words = prompt.removeprefix("summarize: ").split()
+        return " ".join(words[:12]) + "."
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle stalls
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with mock._lock:
+                    mock.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                inputs = body["inputs"]
+                prompts = inputs if isinstance(inputs, list) else [inputs]
+
+                with mock._lock:
+                    mock.requests += 1
+                    mock.items += len(prompts)
+
+                with mock._slots:
+                    time.sleep(mock.overhead + mock.per_item * len(prompts))
+
+                raw = json.dumps([{"summary_text": mock.summarize(p)} for p in prompts]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
@@ -41,16 +41,28 @@ summarizeBtn.addEventListener("click", async () => {
   loader.classList.remove("hidden");
   summaryCard.classList.add("hidden");
 
+  const summaryTextEl = summaryCard.querySelector("p");
+  delete summaryCard.dataset.hash;
+
+  // Render partial output as it streams in
+  const showPartial = text => {
+    loader.classList.add("hidden");
+    summaryCard.classList.remove("hidden");
+    summaryCard.classList.add("streaming");
+    summaryTextEl.innerText = text;
+  };
+
   try {
-    const result = await getSummary();
+    const result = await getSummary(showPartial);
+    summaryCard.classList.remove("streaming");
 
     if (!result.ok) {
+      summaryCard.classList.add("hidden");
       showSnackbar(result.error, true);
       return;
     }
 
     // Populate summary result
-    const summaryTextEl = summaryCard.querySelector("p");
     summaryTextEl.innerText = result.data.summary;
     summaryCard.dataset.hash = result.data.hash;
 
@@ -66,8 +78,11 @@ summarizeBtn.addEventListener("click", async () => {
 
 /**
  * Fetch summary from backend API.
+ * onPartial(text) is called with the partial summary while it streams in.
+ * One request answers it all ("stream": true), so any server worker can
+ * serve it: job ids are only known to the process that queued them.
  */
-async function getSummary() {
+async function getSummary(onPartial) {
   if (!textarea.value.trim()) {
     return {
       ok: false,
@@ -76,17 +91,29 @@ async function getSummary() {
     };
   }
 
+  const streaming = Boolean(window.ReadableStream && window.TextDecoder);
+
   try {
     const response = await fetch("/summarize", {
       method: "POST",
       headers: {
         "Content-Type": "application/json"
       },
-      body: JSON.stringify({ text: textarea.value.trim() })
+      body: JSON.stringify({ text: textarea.value.trim(), stream: streaming })
     });
 
-    const data = await response.json().catch(() => null);
+    const type = response.headers.get("Content-Type") || "";
+    if (response.ok && response.body && type.startsWith("text/event-stream")) {
+      const data = await readSummaryEvents(response, onPartial);
+      return {
+        ok: data.status === "done",
+        status: data.status === "done" ? 200 : 500,
+        data,
+        error: data.status === "done" ? null : data.error || "Server error"
+      };
+    }
 
+    const data = await response.json().catch(() => null);
     return {
       ok: response.ok,
       status: response.status,
@@ -103,6 +130,50 @@ async function getSummary() {
 }
 
 
+/**
+ * Read the event stream of a summary (see job_event_stream in app.py).
+ * Resolves with the data of the final "done" or "failed" event.
+ */
+async function readSummaryEvents(response, onPartial) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+
+  // Pieces arrive out of order (chunks finish independently): keep them by index
+  const parts = [];
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      return { status: "failed", error: "Stream ended early" };
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let end;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+
+      const event = frame.match(/^event: (.*)$/m)?.[1];
+      const data = frame.match(/^data: (.*)$/m)?.[1];
+      if (!event || !data) {
+        continue; // keep-alive comment
+      }
+
+      if (event === "partial") {
+        const part = JSON.parse(data);
+        parts[part.index] = part.text;
+        onPartial(parts.filter(Boolean).join(" "));
+      } else if (event === "done" || event === "failed") {
+        reader.cancel();
+        return JSON.parse(data);
+      }
+    }
+  }
+}
+
+
 /* ===============================
    Toolbar Actions
 =============================== */
@@ -156,7 +227,7 @@ downloadBtn.addEventListener("click", () => {
    Character Limit Handling
 =============================== */
 
-const MAX_CHARS = 5000;
+const MAX_CHARS = 50000;
 
 textarea.addEventListener("input", () => {
   const length = textarea.value.length;
@@ -2,9 +2,10 @@
    Saved Item Actions
 =============================== */
 
-const savedItems = document.querySelectorAll(".saved-item");
-
-savedItems.forEach(savedItem => {
+/**
+ * Wire the copy / download / delete buttons of one saved summary.
+ */
+function setupSavedItem(savedItem) {
   // Action buttons within each saved summary
   const copyBtn = savedItem.querySelector(".copy");
   const downloadBtn = savedItem.querySelector(".download");
@@ -46,9 +47,11 @@ savedItems.forEach(savedItem => {
     const result = await deleteSummary(savedItem.dataset.id);
 
     if (!result.error) {
-      // Remove item from DOM and refresh state
+      // Remove item from DOM; reload for the empty state once nothing is left
       savedItem.remove();
-      window.location.reload();
+      if (!document.querySelector(".saved-item") && !loadMore) {
+        window.location.reload();
+      }
     }
 
     showSnackbar(result.msg, result.error);
@@ -58,7 +61,7 @@ savedItems.forEach(savedItem => {
       deleteBtn.innerText = "delete";
     }, 1500);
   });
-});
+}
 
 
 /* ===============================
@@ -67,7 +70,10 @@ savedItems.forEach(savedItem => {
 
 const COLLAPSED_HEIGHT = 150;
 
-document.querySelectorAll(".content-card").forEach(card => {
+/**
+ * Collapse a long summary card behind a "Show More" toggle.
+ */
+function setupCard(card) {
   const content = card.querySelector(".content");
   const toggle = card.querySelector(".toggle");
   const divider = card.querySelector(".divider");
@@ -93,4 +99,109 @@ document.querySelectorAll(".content-card").forEach(card => {
     const isCollapsed = content.classList.toggle("collapsed");
     toggle.classList.toggle("expanded", !isCollapsed);
   });
-});
\ No newline at end of file
+}
+
+document.querySelectorAll(".saved-item").forEach(setupSavedItem);
+document.querySelectorAll(".content-card").forEach(setupCard);
+
+
+/* ===============================
+   Infinite Scroll
+=============================== */
+
+const savedData = document.querySelector("#saved-data");
+let loadMore = document.querySelector(".load-more");
+let loading = false;
+
+/**
+ * Build a saved summary, same markup as library.html.
+ */
+function savedItemNode(summary) {
+  const item = document.createElement("div");
+  item.className = "saved-item";
+  item.dataset.id = summary.id;
+
+  const toolbar = document.createElement("div");
+  toolbar.className = "toolbar";
+  [["copy", "content_copy"], ["download", "download"], ["danger delete", "delete"]].forEach(([name, icon]) => {
+    const button = document.createElement("button");
+    button.className = `material-symbols-outlined ${name}`;
+    button.textContent = icon;
+    toolbar.append(button);
+  });
+
+  const card = document.createElement("div");
+  card.className = "content-card";
+
+  const content = document.createElement("div");
+  content.className = "content";
+  content.textContent = summary.summary;
+
+  const divider = document.createElement("div");
+  divider.className = "divider";
+
+  const toggle = document.createElement("div");
+  toggle.className = "toggle";
+  const icon = document.createElement("span");
+  icon.className = "material-symbols-outlined icon";
+  icon.textContent = "keyboard_double_arrow_down";
+  const label = document.createElement("span");
+  label.className = "label";
+  toggle.append(icon, label);
+
+  card.append(content, divider, toggle);
+  item.append(toolbar, card);
+  return item;
+}
+
+/**
+ * Fetch the next page from /library/summaries and append it.
+ */
+async function loadNextPage() {
+  if (loading || !loadMore) return;
+  loading = true;
+
+  try {
+    const response = await fetch(loadMore.dataset.next);
+    if (!response.ok) return;
+
+    const data = await response.json();
+    data.summaries.forEach(summary => {
+      const item = savedItemNode(summary);
+      savedData.append(item);
+      // Heights are only known once the item is in the page
+      setupSavedItem(item);
+      setupCard(item.querySelector(".content-card"));
+    });
+
+    if (data.next_after === null) {
+      // Last page reached
+      observer.disconnect();
+      loadMore.remove();
+      loadMore = null;
+    } else {
+      const url = new URL(loadMore.dataset.next, window.location.origin);
+      url.searchParams.set("after", data.next_after);
+      loadMore.dataset.next = url.pathname + url.search;
+    }
+  } finally {
+    loading = false;
+  }
+}
+
+// Load the next page when the link scrolls into view
+const observer = new IntersectionObserver(entries => {
+  if (entries.some(entry => entry.isIntersecting)) {
+    loadNextPage();
+  }
+}, { rootMargin: "600px" });
+
+if (loadMore) {
+  observer.observe(loadMore);
+
+  // Keep the link working as a button too
+  loadMore.addEventListener("click", event => {
+    event.preventDefault();
+    loadNextPage();
+  });
+}
\ No newline at end of file